@@ -1,6 +1,6 @@
 """Main recovery controller"""
 
-from typing import Optional, List
+from typing import Iterator, Optional, List
 from services.disk_service import DiskService
 from services.recovery_service import RecoveryService
 from models.resource_config import ResourceConfig
@@ -25,6 +25,10 @@ class RecoveryController:
         """Lists physical drives with their names/models"""
         return self.disk_service.list_physical_drives_with_names()
     
+    def iter_physical_drives_with_names(self) -> Iterator[dict]:
+        """Yields physical drives with their names/models as they are read"""
+        return self.disk_service.iter_physical_drives_with_names()
+    
     def get_disk_size(self, disk_path: str) -> Optional[int]:
         """Gets disk size"""
         return self.disk_service.get_disk_size(disk_path)
@@ -35,7 +39,8 @@ class RecoveryController:
                       filter_system: bool = True,
                       progress_callback=None,
                       resource_config: Optional[ResourceConfig] = None,
-                      preview_mode: bool = False) -> int:
+                      preview_mode: bool = False,
+                      message_callback=None) -> int:
         """
         Starts the recovery process
         
@@ -48,11 +53,12 @@ class RecoveryController:
             progress_callback: Progress callback
             resource_config: Resource configuration (None = balanced mode)
             preview_mode: If True, only lists files without saving
+            message_callback: Callback for per-file messages (None = print)
         
         Returns:
             Number of files found/recovered
         """
-        self.recovery_service = RecoveryService(progress_callback, resource_config)
+        self.recovery_service = RecoveryService(progress_callback, resource_config, message_callback)
         return self.recovery_service.recover_files(
             disk_path, output_dir, file_types, search_pattern, filter_system, preview_mode
         )
@@ -1,6 +1,7 @@
 """Configuración y constantes del sistema"""
 
 import re
+from functools import lru_cache
 
 # Constantes de escaneo
 BLOCK_SIZE = 4096
@@ -10,6 +11,16 @@ OVERLAP = 256  # Solapamiento entre ventanas
 CODIFICACIONES = ['utf-8', 'latin-1', 'windows-1252', 'cp850', 'ascii']
 
 
+def _flatten_signatures(signatures, text_types):
+    """Aplana las firmas no vacías en tuplas (firma, tipo): binarias primero, texto al final"""
+    binarias = []
+    texto = []
+    for tipo, firmas in signatures.items():
+        destino = texto if tipo in text_types else binarias
+        destino.extend((firma, tipo) for firma in firmas if firma)
+    return tuple(binarias + texto)
+
+
 class FileSignatures:
     """Firmas de archivos (magic numbers)"""
     SIGNATURES = {
@@ -38,6 +49,16 @@ class FileSignatures:
         'conf': [b''],
     }
     
+    # Tipos de texto: sus firmas (ej: '{', '[', '<html') solo son fiables
+    # cuando el bloque ya se ha clasificado como texto
+    TEXT_TYPES = frozenset(('txt', 'csv', 'log', 'ini', 'cfg', 'conf', 'html', 'htm', 'xml', 'json'))
+    
+    # Firmas precalculadas como tupla plana, en orden de prioridad
+    FLAT_SIGNATURES = _flatten_signatures(SIGNATURES, TEXT_TYPES)
+    
+    # Conjunto de tipos soportados, para validar la entrada del usuario
+    ALL_TYPES = frozenset(SIGNATURES)
+    
     @classmethod
     def get_signatures(cls, file_type):
         """Obtiene las firmas para un tipo de archivo"""
@@ -61,29 +82,31 @@ class SystemFiles:
     
     SYSTEM_EXTENSIONS = ['.sys', '.dll', '.exe', '.drv', '.vxd', '.386']
     
+    # Estructuras precalculadas para búsquedas O(1) y un único endswith en C
+    _SYSTEM_FILES_SET = frozenset(f.lower() for f in SYSTEM_FILES)
+    _SYSTEM_EXT_TUPLE = tuple(SYSTEM_EXTENSIONS)
+    
     @classmethod
     def is_system_file(cls, filename):
         """Verifica si un archivo es del sistema"""
         if not filename:
             return False
         
-        filename_lower = filename.lower()
-        
-        # Verificar nombres específicos
-        for sys_file in cls.SYSTEM_FILES:
-            if sys_file.lower() in filename_lower:
-                return True
-        
+        return cls.is_system_file_lower(filename.lower())
+    
+    @classmethod
+    def is_system_file_lower(cls, filename_lower):
+        """Igual que is_system_file, pero con el nombre ya en minúsculas"""
         # Verificar si empieza con $ (archivos NTFS)
         if filename_lower.startswith('$'):
             return True
         
-        # Verificar extensiones del sistema
-        for ext in cls.SYSTEM_EXTENSIONS:
-            if filename_lower.endswith(ext):
-                return True
+        # Verificar nombres específicos
+        if filename_lower in cls._SYSTEM_FILES_SET:
+            return True
         
-        return False
+        # Verificar extensiones del sistema
+        return filename_lower.endswith(cls._SYSTEM_EXT_TUPLE)
 
 
 class SystemDirectories:
@@ -110,6 +133,15 @@ class SystemDirectories:
         r'programdata\application data',
     ]
     
+    # Patrones que indican una ruta real del sistema, compilados una sola vez:
+    # 1. C:\Program Files\... o \Program Files\... (barra antes del directorio)
+    # 2. Program Files\... (al inicio de la ruta, con barra después)
+    # Así se evitan falsos positivos (ej: un archivo llamado "myprogram.txt")
+    _DIRS_ALTERNATION = '|'.join(re.escape(d.lower()) for d in SYSTEM_DIRECTORIES)
+    _COMBINED_RE = re.compile(
+        rf'\\(?:{_DIRS_ALTERNATION})(?:\\|$)|^(?:{_DIRS_ALTERNATION})\\'
+    )
+    
     @classmethod
     def is_system_directory(cls, filepath):
         """
@@ -125,39 +157,19 @@ class SystemDirectories:
             return False
         
         # Normalizar la ruta (convertir a minúsculas y normalizar separadores)
-        filepath_lower = filepath.lower().replace('/', '\\')
-        
-        # Verificar cada directorio del sistema
-        for sys_dir in cls.SYSTEM_DIRECTORIES:
-            sys_dir_normalized = sys_dir.lower()
-            
-            # Buscar el directorio en la ruta con patrones más específicos
-            # para evitar falsos positivos (ej: un archivo llamado "myprogram.txt")
-            
-            # Patrones que indican una ruta real del sistema:
-            # 1. C:\Program Files\... (con unidad y barra)
-            # 2. \Program Files\... (barra inicial)
-            # 3. Program Files\... (al inicio de la ruta o después de una barra)
-            patterns = [
-                # Patrón con unidad de disco: C:\Program Files\...
-                rf'[a-z]:\\{re.escape(sys_dir_normalized)}\\',
-                rf'[a-z]:\\{re.escape(sys_dir_normalized)}$',
-                # Patrón con barra inicial: \Program Files\...
-                rf'\\{re.escape(sys_dir_normalized)}\\',
-                rf'\\{re.escape(sys_dir_normalized)}$',
-                # Patrón al inicio: Program Files\... (sin unidad, pero con barra después)
-                rf'^{re.escape(sys_dir_normalized)}\\',
-            ]
-            
-            for pattern in patterns:
-                if re.search(pattern, filepath_lower):
-                    return True
-        
-        return False
+        return cls.is_system_directory_normalized(filepath.lower().replace('/', '\\'))
+    
+    @classmethod
+    @lru_cache(maxsize=8192)
+    def is_system_directory_normalized(cls, filepath_normalized):
+        """Igual que is_system_directory, pero con la ruta ya en minúsculas y con '\\'"""
+        return cls._COMBINED_RE.search(filepath_normalized) is not None
 
 
 class Config:
     """Configuración principal del sistema"""
+    __slots__ = ('block_size', 'min_text_len', 'window_size', 'overlap', 'encodings')
+    
     def __init__(self):
         self.block_size = BLOCK_SIZE
         self.min_text_len = MIN_TEXT_LEN
@@ -0,0 +1,67 @@
+"""Compact storage for the files found during a scan"""
+
+from array import array
+from collections.abc import Sequence
+
+
+class PreviewList(Sequence):
+    """
+    Column-oriented list of found files
+    
+    Each field is kept in its own column (sizes and positions as 64-bit
+    integer arrays) instead of one dict per file. Indexing and iteration
+    still return the usual file_info dicts, built on demand.
+    """
+    
+    __slots__ = ('filenames', 'original_names', 'types', 'sizes', 'positions')
+    
+    def __init__(self):
+        self.filenames = []
+        self.original_names = []
+        self.types = []
+        self.sizes = array('q')
+        self.positions = array('q')
+    
+    def append(self, filename, original_name, file_type, size, position):
+        """Adds a found file"""
+        self.original_names.append(original_name)
+        self.types.append(file_type)
+        self.sizes.append(size)
+        self.positions.append(position)
+        # filenames gives the length, so it goes last: a reader in another
+        # thread never sees a file whose other columns are still missing
+        self.filenames.append(filename)
+    
+    def clear(self):
+        """Removes every file"""
+        self.filenames.clear()
+        self.original_names.clear()
+        self.types.clear()
+        del self.sizes[:]
+        del self.positions[:]
+    
+    def __len__(self):
+        return len(self.filenames)
+    
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._file_info(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("preview list index out of range")
+        return self._file_info(index)
+    
+    def __iter__(self):
+        for index in range(len(self.filenames)):
+            yield self._file_info(index)
+    
+    def _file_info(self, index):
+        """Builds the file_info dict of one file"""
+        return {
+            'filename': self.filenames[index],
+            'original_name': self.original_names[index],
+            'type': self.types[index],
+            'size': self.sizes[index],
+            'position': self.positions[index]
+        }
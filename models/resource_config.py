@@ -4,12 +4,26 @@ import time
 import os
 import ctypes
 import platform
+from functools import lru_cache
 
-try:
-    import psutil
-    PSUTIL_AVAILABLE = True
-except ImportError:
-    PSUTIL_AVAILABLE = False
+
+@lru_cache(maxsize=None)
+def _get_psutil():
+    """Imports psutil on first use (None if not installed)"""
+    try:
+        import psutil
+        return psutil
+    except ImportError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _get_process():
+    """Single process handle shared by every ResourceConfig instance"""
+    psutil = _get_psutil()
+    if psutil is None:
+        return None
+    return psutil.Process(os.getpid())
 
 # Windows memory detection using ctypes (fallback if psutil not available)
 if platform.system() == 'Windows':
@@ -26,11 +40,17 @@ if platform.system() == 'Windows':
             ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
         ]
     
+    @lru_cache(maxsize=None)
+    def _get_memory_status():
+        """Single MEMORYSTATUSEX buffer reused by every query"""
+        mem_status = MEMORYSTATUSEX()
+        mem_status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        return mem_status
+    
     def get_windows_memory():
         """Gets total and available memory on Windows using Windows API"""
         try:
-            mem_status = MEMORYSTATUSEX()
-            mem_status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+            mem_status = _get_memory_status()
             ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(mem_status))
             
             total_mb = mem_status.ullTotalPhys / (1024 * 1024)
@@ -46,8 +66,11 @@ else:
 class ResourceConfig:
     """Configuration for resource usage during recovery"""
     
+    __slots__ = ('max_memory_mb', 'cpu_limit', 'block_delay_ms', 'buffer_size',
+                 'progress_interval', '_check_interval', '_check_counter', '_last_ok')
+    
     def __init__(self, max_memory_mb=None, cpu_limit=None, 
-                 block_delay_ms=0, buffer_size=3):
+                 block_delay_ms=0, buffer_size=3, progress_interval=0.25):
         """
         Initialize resource configuration
         
@@ -56,43 +79,54 @@ class ResourceConfig:
             cpu_limit: CPU usage limit as percentage (None = unlimited)
             block_delay_ms: Delay between blocks in milliseconds (0 = no delay)
             buffer_size: Size of block buffer for fragmented text reconstruction
+            progress_interval: Minimum seconds between progress display updates
         """
         self.max_memory_mb = max_memory_mb
         self.cpu_limit = cpu_limit
         self.block_delay_ms = block_delay_ms
         self.buffer_size = buffer_size
-        if PSUTIL_AVAILABLE:
-            self.process = psutil.Process(os.getpid())
-        else:
-            self.process = None
+        self.progress_interval = progress_interval
+        # Memory is only sampled every _check_interval calls (~1 MB of 4 KB blocks)
+        self._check_interval = 256
+        self._check_counter = 0
+        self._last_ok = True
     
-    def check_memory_limit(self):
-        """Checks if memory usage is within limits"""
+    def check_memory_limit(self, force=False):
+        """
+        Checks if memory usage is within limits
+        
+        Args:
+            force: If True, samples memory now instead of reusing the last result
+        """
         if self.max_memory_mb is None:
             return True
         
-        if not PSUTIL_AVAILABLE or not self.process:
+        process = _get_process()
+        if process is None:
             # If psutil not available, assume OK
             return True
         
+        if self._check_counter and not force:
+            self._check_counter -= 1
+            return self._last_ok
+        self._check_counter = self._check_interval - 1
+        
         try:
-            memory_info = self.process.memory_info()
-            memory_mb = memory_info.rss / (1024 * 1024)
-            
-            if memory_mb > self.max_memory_mb:
-                return False
+            memory_mb = process.memory_info().rss / (1024 * 1024)
+            self._last_ok = memory_mb <= self.max_memory_mb
         except:
             # If error checking memory, allow continuation
-            return True
-        return True
+            self._last_ok = True
+        return self._last_ok
     
     def get_memory_usage_mb(self):
         """Gets current memory usage in MB"""
-        if not PSUTIL_AVAILABLE or not self.process:
+        process = _get_process()
+        if process is None:
             return 0.0
         
         try:
-            memory_info = self.process.memory_info()
+            memory_info = process.memory_info()
             return memory_info.rss / (1024 * 1024)
         except:
             return 0.0
@@ -102,9 +136,9 @@ class ResourceConfig:
         if self.block_delay_ms > 0:
             time.sleep(self.block_delay_ms / 1000.0)
     
-    def should_continue(self):
+    def should_continue(self, force=False):
         """Checks if recovery should continue based on resource limits"""
-        if not self.check_memory_limit():
+        if not self.check_memory_limit(force):
             return False
         return True
     
@@ -112,7 +146,8 @@ class ResourceConfig:
     def get_available_memory_mb():
         """Gets available system memory in MB"""
         # Try psutil first
-        if PSUTIL_AVAILABLE:
+        psutil = _get_psutil()
+        if psutil is not None:
             try:
                 memory = psutil.virtual_memory()
                 # Return total system memory (RAM total)
@@ -133,7 +168,8 @@ class ResourceConfig:
     def get_free_memory_mb():
         """Gets free/available system memory in MB"""
         # Try psutil first
-        if PSUTIL_AVAILABLE:
+        psutil = _get_psutil()
+        if psutil is not None:
             try:
                 memory = psutil.virtual_memory()
                 # Return available memory (free + cached)
@@ -177,7 +213,8 @@ class ResourceConfig:
             max_memory_mb=max_memory,
             cpu_limit=None,      # Unlimited CPU
             block_delay_ms=0,    # No delay
-            buffer_size=buffer_size  # Dynamic buffer based on memory
+            buffer_size=buffer_size,  # Dynamic buffer based on memory
+            progress_interval=1.0  # Refresh progress once per second
         )
     
     @staticmethod
@@ -1,32 +1,103 @@
 """Service for file type detection"""
 
+from collections import defaultdict
 from typing import Optional
-from models.config import FileSignatures, MIN_TEXT_LEN
+from models.config import FileSignatures
 from utils.encoding_utils import is_text
 
 
+# Firmas compartidas por varios tipos: se devuelve un tipo neutro
+# (ej: PK\x03\x04 es tanto zip como docx/xlsx/pptx)
+_AMBIGUOUS_SIGNATURES = {
+    b'PK\x03\x04': 'zip',
+}
+
+# Contenedores ZIP de Office Open XML: el nombre de la primera entrada
+# (offset 30 de la cabecera local) indica de qué documento se trata
+_ZIP_LOCAL_HEADER = b'PK\x03\x04'
+_ZIP_FAMILY = (
+    (b'word/', 'docx'),
+    (b'xl/', 'xlsx'),
+    (b'ppt/', 'pptx'),
+)
+
+
+def _resolve_zip_family(data):
+    """Distingue docx/xlsx/pptx de un zip genérico por su primera entrada"""
+    nombre = data[30:60]
+    for marca, tipo in _ZIP_FAMILY:
+        if marca in nombre:
+            return tipo
+    return 'zip'
+
+
+def _build_first_byte_map(text_types):
+    """
+    Agrupa las firmas no vacías por su primer byte
+    
+    Cada primer byte apunta a una tupla de (tipo, firmas), donde firmas es la
+    tupla de prefijos de ese tipo, para comprobarlos todos con un único
+    bytes.startswith(tupla). Los tipos se ordenan por su firma más larga, así
+    que la primera coincidencia es la más específica. Si varias firmas son
+    idénticas gana el primer tipo declarado en FileSignatures.SIGNATURES
+    (salvo las de _AMBIGUOUS_SIGNATURES).
+    
+    Args:
+        text_types: True para incluir solo tipos de texto, False para binarios
+    """
+    by_first = defaultdict(dict)
+    for firma, tipo in FileSignatures.FLAT_SIGNATURES:
+        if (tipo in FileSignatures.TEXT_TYPES) == text_types:
+            by_first[firma[0]].setdefault(firma, _AMBIGUOUS_SIGNATURES.get(firma, tipo))
+    
+    first_byte_map = {}
+    for first, candidates in by_first.items():
+        by_type = {}
+        for firma, tipo in sorted(candidates.items(), key=lambda item: -len(item[0])):
+            by_type.setdefault(tipo, []).append(firma)
+        first_byte_map[first] = tuple((tipo, tuple(firmas)) for tipo, firmas in by_type.items())
+    return first_byte_map
+
+
+_BINARY_BY_FIRST = _build_first_byte_map(text_types=False)
+_TEXT_BY_FIRST = _build_first_byte_map(text_types=True)
+
+
+def _match_first_byte(data, by_first):
+    """Busca el tipo cuya firma más larga coincide con el inicio de los datos"""
+    for tipo, firmas in by_first.get(data[0], ()):
+        if data.startswith(firmas):
+            return tipo
+    return None
+
+
 class DetectionService:
     """Servicio para detectar tipos de archivo y contenido"""
     
+    @staticmethod
+    def match_signature(data: bytes) -> Optional[str]:
+        """Busca la firma binaria más larga que coincide con el inicio de los datos"""
+        tipo = _match_first_byte(data, _BINARY_BY_FIRST)
+        if tipo == 'zip' and data.startswith(_ZIP_LOCAL_HEADER):
+            return _resolve_zip_family(data)
+        return tipo
+    
     @staticmethod
     def detect_file_type(data: bytes) -> Optional[str]:
         """Detecta el tipo de archivo por su firma (magic number)"""
         if not data or len(data) < 4:
             return None
         
-        # Verificar firmas conocidas
-        for tipo, firmas in FileSignatures.SIGNATURES.items():
-            for firma in firmas:
-                if firma and data.startswith(firma):
-                    return tipo
-                # Para tipos de texto sin firma específica, verificar si es texto
-                if not firma and tipo in ['txt', 'csv', 'log', 'ini', 'cfg', 'conf']:
-                    if is_text(data[:1024], threshold=0.8):
-                        return tipo
+        # Solo se comparan las firmas binarias que empiezan por el mismo byte;
+        # la mayoría de bloques no tiene ninguna y se descarta con un lookup
+        if data[0] in _BINARY_BY_FIRST:
+            tipo = DetectionService.match_signature(data)
+            if tipo:
+                return tipo
         
-        # Si no tiene firma pero es texto, asumir txt
-        if is_text(data[:1024], threshold=0.8):
-            return 'txt'
+        # Sin firma binaria: comprobar una única vez si es texto
+        if not is_text(data[:1024], threshold=0.8):
+            return None
         
-        return None
-
+        # Es texto: usar la firma de texto si la hay, si no asumir txt
+        return _match_first_byte(data, _TEXT_BY_FIRST) or 'txt'
@@ -1,9 +1,113 @@
 """Service for disk management"""
 
 import os
+import ctypes
+import platform
 import string
 import subprocess
-from typing import List, Optional
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+# Windows disk size detection using ctypes (avoids spawning wmic)
+if platform.system() == 'Windows':
+    GENERIC_READ = 0x80000000
+    FILE_SHARE_READ = 0x00000001
+    FILE_SHARE_WRITE = 0x00000002
+    OPEN_EXISTING = 3
+    IOCTL_DISK_GET_LENGTH_INFO = 0x0007405C
+    INVALID_HANDLE_VALUE = ctypes.c_void_p(-1).value
+    
+    class GET_LENGTH_INFORMATION(ctypes.Structure):
+        _fields_ = [
+            ("Length", ctypes.c_longlong),
+        ]
+    
+    def get_windows_device_length(device_path):
+        """Gets the length in bytes of a disk or volume device using DeviceIoControl"""
+        try:
+            kernel32 = ctypes.windll.kernel32
+            kernel32.CreateFileW.restype = ctypes.c_void_p
+            handle = kernel32.CreateFileW(
+                device_path, GENERIC_READ, FILE_SHARE_READ | FILE_SHARE_WRITE,
+                None, OPEN_EXISTING, 0, None
+            )
+            if handle is None or handle == INVALID_HANDLE_VALUE:
+                return None
+            
+            try:
+                length_info = GET_LENGTH_INFORMATION()
+                bytes_returned = ctypes.c_ulong(0)
+                ok = kernel32.DeviceIoControl(
+                    ctypes.c_void_p(handle), IOCTL_DISK_GET_LENGTH_INFO, None, 0,
+                    ctypes.byref(length_info), ctypes.sizeof(length_info),
+                    ctypes.byref(bytes_returned), None
+                )
+                return length_info.Length if ok else None
+            finally:
+                kernel32.CloseHandle(ctypes.c_void_p(handle))
+        except:
+            return None
+    
+    def get_windows_volume_size(drive_letter):
+        """Gets the total size in bytes of a logical drive using GetDiskFreeSpaceExW"""
+        try:
+            total_bytes = ctypes.c_ulonglong(0)
+            ok = ctypes.windll.kernel32.GetDiskFreeSpaceExW(
+                f"{drive_letter}:\\", None, ctypes.byref(total_bytes), None
+            )
+            return total_bytes.value if ok else None
+        except:
+            return None
+    
+    def get_windows_logical_drives():
+        """Gets the logical drive letters from the GetLogicalDrives bitmask"""
+        try:
+            bitmask = ctypes.windll.kernel32.GetLogicalDrives()
+            if not bitmask:
+                return None
+            return [letter for i, letter in enumerate(string.ascii_uppercase)
+                    if bitmask & (1 << i)]
+        except:
+            return None
+else:
+    def get_windows_device_length(device_path):
+        return None
+    
+    def get_windows_volume_size(drive_letter):
+        return None
+    
+    def get_windows_logical_drives():
+        return None
+
+# Win32_DiskDrive properties read for each physical drive
+DRIVE_FIELDS = ('Index', 'Model', 'Size', 'SerialNumber', 'InterfaceType')
+
+# WMI COM connections are bound to the thread that created them,
+# so each thread keeps its own (None if the wmi module is unavailable)
+_wmi_local = threading.local()
+
+
+def _get_wmi_connection():
+    """Gets this thread's cached WMI connection, creating it on first use"""
+    connection = getattr(_wmi_local, 'connection', False)
+    if connection is False:
+        try:
+            import wmi
+            connection = wmi.WMI()
+        except:
+            connection = None
+        _wmi_local.connection = connection
+    return connection
+
+# Logical drive list cache: (timestamp, drives)
+LOGICAL_DRIVES_TTL = 2.0
+_logical_drives_cache = (0.0, None)
+
+# Physical drive lookups keyed by drive index. Only successful results
+# are stored, so a drive that failed to answer is queried again next time
+_drive_info_cache = {}
+_drive_size_cache = {}
 
 
 class DiskService:
@@ -12,128 +116,188 @@ class DiskService:
     @staticmethod
     def list_logical_drives() -> List[str]:
         """Lists available logical drives"""
-        drives = []
-        for letter in string.ascii_uppercase:
-            if os.path.exists(f"{letter}:\\"):
-                drives.append(letter)
-        return drives
+        global _logical_drives_cache
+        timestamp, cached = _logical_drives_cache
+        if cached is not None and time.monotonic() - timestamp < LOGICAL_DRIVES_TTL:
+            return list(cached)
+        
+        # Single GetLogicalDrives call instead of probing every letter,
+        # which can stall on disconnected network or removable drives
+        drives = get_windows_logical_drives()
+        if drives is None:
+            drives = []
+            for letter in string.ascii_uppercase:
+                if os.path.exists(f"{letter}:\\"):
+                    drives.append(letter)
+        
+        _logical_drives_cache = (time.monotonic(), drives)
+        return list(drives)
     
     @staticmethod
     def list_physical_drives() -> List[str]:
         """Lists available physical drives"""
+        return [f"PhysicalDrive{fields['Index']}"
+                for fields in DiskService._query_drives()
+                if fields.get('Index', '').isdigit()]
+    
+    @staticmethod
+    def _query_drives(drive_index: Optional[str] = None) -> Iterator[dict]:
+        """
+        Yields Win32_DiskDrive fields for all drives or a single one
+        
+        Uses the cached WMI connection when the wmi module is installed,
+        otherwise falls back to spawning wmic. Each drive is yielded as soon
+        as its fields are read, so callers can show it before the rest.
+        """
+        connection = _get_wmi_connection()
+        if connection is not None:
+            yielded = False
+            try:
+                if drive_index is None:
+                    disks = connection.Win32_DiskDrive()
+                else:
+                    disks = connection.Win32_DiskDrive(Index=int(drive_index))
+                
+                # Every property read is a COM call, so read them per drive
+                for disk in disks:
+                    fields = {}
+                    for key in DRIVE_FIELDS:
+                        value = getattr(disk, key, None)
+                        if value is not None:
+                            fields[key] = str(value).strip()
+                    yielded = True
+                    yield fields
+                return
+            except GeneratorExit:
+                raise
+            except:
+                # Fall back to wmic only if no drive was reported yet
+                if yielded:
+                    return
+        
+        command = ["wmic", "diskdrive"]
+        if drive_index is not None:
+            command += ["where", f"Index={drive_index}"]
+        command += ["get", ",".join(DRIVE_FIELDS), "/format:list"]
         try:
-            output = subprocess.check_output(
-                "wmic diskdrive get Index,Model,Size",
-                shell=True
-            ).decode(errors="ignore")
-            
-            drives = []
-            for line in output.splitlines():
-                parts = line.strip().split()
-                if parts and parts[0].isdigit():
-                    drives.append(f"PhysicalDrive{parts[0]}")
-            return drives
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+            )
         except:
-            return []
+            return
+        
+        # Parse wmic's output line by line while it is still running
+        with process:
+            try:
+                lines = (line.decode(errors="ignore") for line in process.stdout)
+                yield from DiskService._iter_wmic_records(lines)
+            except GeneratorExit:
+                process.kill()
+                raise
+            except:
+                process.kill()
+    
+    @staticmethod
+    def _iter_wmic_records(lines: Iterable[str]) -> Iterator[dict]:
+        """Yields one dict of fields per record of wmic /format:list output"""
+        fields = {}
+        
+        # Each record is a group of Key=Value lines separated by blank lines
+        # (wmic ends lines with \r\r\n, so strip() drops the \r as well)
+        for line in lines:
+            line = line.strip()
+            if '=' in line:
+                key, value = line.split('=', 1)
+                fields[key] = value.strip()
+            elif not line and fields:
+                yield fields
+                fields = {}
+        
+        if fields:
+            yield fields
+    
+    @staticmethod
+    def _drive_details(fields: dict) -> dict:
+        """Extracts model, size, serial and interface from wmic drive fields"""
+        info = {}
+        if 'Model' in fields:
+            info['model'] = fields['Model']
+        if fields.get('Size', '').isdigit():
+            info['size'] = int(fields['Size'])
+        if 'SerialNumber' in fields:
+            info['serial'] = fields['SerialNumber']
+        if 'InterfaceType' in fields:
+            info['interface'] = fields['InterfaceType']
+        return info
     
     @staticmethod
     def get_physical_drive_info(drive_index: str) -> Optional[dict]:
         """Gets detailed information about a physical drive"""
-        try:
-            output = subprocess.check_output(
-                f'wmic diskdrive where Index={drive_index} get Model,Size,SerialNumber,InterfaceType /format:list',
-                shell=True
-            ).decode(errors="ignore")
-            
-            info = {}
-            for line in output.splitlines():
-                line = line.strip()
-                if '=' in line:
-                    key, value = line.split('=', 1)
-                    if key == 'Model':
-                        info['model'] = value.strip()
-                    elif key == 'Size':
-                        if value.strip().isdigit():
-                            info['size'] = int(value.strip())
-                    elif key == 'SerialNumber':
-                        info['serial'] = value.strip()
-                    elif key == 'InterfaceType':
-                        info['interface'] = value.strip()
-            
-            return info if info else None
-        except:
+        info = _drive_info_cache.get(drive_index)
+        if info is not None:
+            return dict(info)
+        
+        fields = next(DiskService._query_drives(drive_index), None)
+        info = DiskService._drive_details(fields) if fields else {}
+        if not info:
             return None
+        
+        _drive_info_cache[drive_index] = info
+        return dict(info)
     
     @staticmethod
-    def list_physical_drives_with_names() -> List[dict]:
-        """Lists physical drives with their names/models"""
+    def iter_physical_drives_with_names() -> Iterator[dict]:
+        """Yields physical drives with their names/models as they are read"""
         try:
-            output = subprocess.check_output(
-                "wmic diskdrive get Index,Model,Size",
-                shell=True
-            ).decode(errors="ignore")
-            
-            drives = []
-            lines = output.splitlines()
-            
-            # Skip header line
-            for line in lines[1:]:
-                line = line.strip()
-                if not line:
+            # A single query returns every field for all drives,
+            # instead of one extra call per drive for the details
+            for fields in DiskService._query_drives():
+                index = fields.get('Index', '')
+                if not index.isdigit():
                     continue
                 
-                # Parse the line - format is usually: Index Model Size
-                parts = line.split(None, 2)  # Split into max 3 parts
-                if len(parts) >= 2 and parts[0].isdigit():
-                    index = parts[0]
-                    model = parts[1] if len(parts) > 1 else "Unknown"
-                    size_str = parts[2] if len(parts) > 2 else "0"
-                    
-                    # Get additional info
-                    drive_info = DiskService.get_physical_drive_info(index)
-                    
-                    drive_dict = {
-                        'index': index,
-                        'name': f"PhysicalDrive{index}",
-                        'model': model,
-                        'display_name': f"PhysicalDrive{index} - {model}"
-                    }
-                    
-                    if drive_info:
-                        if 'size' in drive_info:
-                            drive_dict['size'] = drive_info['size']
-                        if 'serial' in drive_info:
-                            drive_dict['serial'] = drive_info['serial']
-                        if 'interface' in drive_info:
-                            drive_dict['interface'] = drive_info['interface']
-                    
-                    drives.append(drive_dict)
-            
-            return drives
+                model = fields.get('Model') or "Unknown"
+                drive_dict = {
+                    'index': index,
+                    'name': f"PhysicalDrive{index}",
+                    'model': model,
+                    'display_name': f"PhysicalDrive{index} - {model}"
+                }
+                
+                drive_info = DiskService._drive_details(fields)
+                for key in ('size', 'serial', 'interface'):
+                    if key in drive_info:
+                        drive_dict[key] = drive_info[key]
+                
+                yield drive_dict
         except Exception as e:
-            return []
+            return
+    
+    @staticmethod
+    def list_physical_drives_with_names() -> List[dict]:
+        """Lists physical drives with their names/models"""
+        return list(DiskService.iter_physical_drives_with_names())
     
     @staticmethod
     def get_physical_drive_size(drive_index: str) -> Optional[int]:
-        """Gets the size of a physical drive using wmic"""
-        try:
-            output = subprocess.check_output(
-                f"wmic diskdrive where Index={drive_index} get Size",
-                shell=True
-            ).decode(errors="ignore")
-            
-            for line in output.splitlines():
-                line = line.strip()
-                if line and line.isdigit():
-                    return int(line)
-        except:
-            pass
-        return None
+        """Gets the size of a physical drive (DeviceIoControl, then WMI/wmic)"""
+        size = _drive_size_cache.get(drive_index)
+        if size is not None:
+            return size
+        
+        size = get_windows_device_length(rf"\\.\PhysicalDrive{drive_index}")
+        if not size:
+            fields = next(DiskService._query_drives(drive_index), None)
+            size = DiskService._drive_details(fields).get('size') if fields else None
+        
+        if size:
+            _drive_size_cache[drive_index] = size
+        return size
     
     @staticmethod
     def get_disk_size(disk_path: str) -> Optional[int]:
         """Gets the disk size, whether logical or physical"""
-        # If it's a physical disk, use wmic
+        # If it's a physical disk, query the device length
         if disk_path.startswith(r"\\.\PhysicalDrive"):
             try:
                 # Extract the disk index
@@ -144,7 +308,13 @@ class DiskService:
             except:
                 pass
         
-        # For logical disks, try seek
+        # For logical disks (\\.\C:), ask the volume for its total size
+        elif disk_path.startswith("\\\\.\\") and disk_path.endswith(":") and len(disk_path) == 6:
+            size = get_windows_volume_size(disk_path[4])
+            if size:
+                return size
+        
+        # Fallback: try seek
         try:
             with open(disk_path, "rb") as disk:
                 disk.seek(0, 2)  # Go to end
@@ -2,10 +2,121 @@
 
 import os
 import re
-from typing import Optional, List
+from functools import lru_cache
+from typing import Callable, Collection, Optional, Tuple
 from models.config import SystemFiles, SystemDirectories
 from services.detection_service import DetectionService
 
+try:
+    import hyperscan
+    HYPERSCAN_AVAILABLE = True
+except ImportError:
+    HYPERSCAN_AVAILABLE = False
+
+
+@lru_cache(maxsize=2048)
+def _compile_wildcard(pattern: str) -> Optional[re.Pattern]:
+    """Compila un patrón con wildcards (* y %) una sola vez por patrón"""
+    if not pattern:
+        return None
+    
+    # Escapar los caracteres especiales de regex excepto los wildcards:
+    # * = cualquier secuencia de caracteres (0 o más)
+    # % = uno o más caracteres (más flexible que solo uno)
+    comodines = {'*': '.*', '%': '.+'}
+    patron_escaped = ''.join(comodines.get(c) or re.escape(c) for c in pattern)
+    
+    try:
+        return re.compile(patron_escaped, re.IGNORECASE)
+    except re.error:
+        return None
+
+
+@lru_cache(maxsize=2048)
+def _compile_hyperscan(pattern: str):
+    """Compila el patrón con hyperscan (DFA, sin backtracking); None si no es posible"""
+    compiled = _compile_wildcard(pattern)
+    if compiled is None:
+        return None
+    
+    try:
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[f'^(?:{compiled.pattern})$'.encode('utf-8')],
+            ids=[0],
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH |
+                   hyperscan.HS_FLAG_UTF8]
+        )
+        return database
+    except Exception:
+        return None
+
+
+def _wildcard_fullmatch(pattern: str, texto: str) -> bool:
+    """Comprueba si texto coincide entero con el patrón (hyperscan si está disponible)"""
+    if HYPERSCAN_AVAILABLE:
+        database = _compile_hyperscan(pattern)
+        if database is not None:
+            coincidencias = []
+            
+            def on_match(match_id, start, end, flags, context):
+                coincidencias.append(match_id)
+                return True  # Detener el escaneo en la primera coincidencia
+            
+            try:
+                database.scan(texto.encode('utf-8'), match_event_handler=on_match)
+                return bool(coincidencias)
+            except Exception:
+                pass
+    
+    compiled = _compile_wildcard(pattern)
+    return compiled is not None and compiled.fullmatch(texto) is not None
+
+
+@lru_cache(maxsize=256)
+def _compile_search(nombre_busqueda: str) -> Callable[[str, str], bool]:
+    """
+    Resuelve una única vez un patrón de búsqueda en una función de coincidencia
+    
+    El patrón se pasa a minúsculas, se separa su extensión y se compila al
+    construir la función; esta recibe (nombre_lower, nombre_sin_ext) y solo
+    hace la comparación.
+    """
+    busqueda_lower = nombre_busqueda.lower()
+    busqueda_sin_ext, busqueda_ext = os.path.splitext(busqueda_lower)
+    
+    if '*' in busqueda_lower or '%' in busqueda_lower:
+        # Con extensión se compara el nombre completo; sin ella, solo el nombre
+        patron = busqueda_lower if busqueda_ext else busqueda_sin_ext
+        if HYPERSCAN_AVAILABLE and _compile_hyperscan(patron) is not None:
+            if busqueda_ext:
+                return lambda nombre_lower, nombre_sin_ext: \
+                    _wildcard_fullmatch(patron, nombre_lower)
+            return lambda nombre_lower, nombre_sin_ext: \
+                _wildcard_fullmatch(patron, nombre_sin_ext)
+        
+        compiled = _compile_wildcard(patron)
+        if compiled is None:
+            return lambda nombre_lower, nombre_sin_ext: False
+        fullmatch = compiled.fullmatch
+        if busqueda_ext:
+            return lambda nombre_lower, nombre_sin_ext: \
+                fullmatch(nombre_lower) is not None
+        return lambda nombre_lower, nombre_sin_ext: \
+            fullmatch(nombre_sin_ext) is not None
+    
+    # Búsqueda simple sin wildcards (búsqueda parcial)
+    if busqueda_ext:
+        # Si incluye extensión, buscar en el nombre completo
+        return lambda nombre_lower, nombre_sin_ext: busqueda_lower in nombre_lower
+    # Si no incluye extensión, buscar en el nombre (con o sin extensión)
+    return lambda nombre_lower, nombre_sin_ext: \
+        busqueda_sin_ext in nombre_sin_ext or busqueda_sin_ext in nombre_lower
+
+
+# Marca de "tipo aún no detectado" (None es un resultado válido de la detección)
+_SIN_DETECTAR = object()
+
 
 class FilterService:
     """Service for filtering files according to criteria"""
@@ -13,101 +124,64 @@ class FilterService:
     @staticmethod
     def convert_wildcard_to_regex(pattern: str) -> Optional[str]:
         """Converts a pattern with wildcards (* and %) to regular expression"""
-        if not pattern:
-            return None
-        
-        # Escapar caracteres especiales de regex excepto * y %
-        patron_escaped = re.escape(pattern)
+        compiled = _compile_wildcard(pattern)
+        return compiled.pattern if compiled else None
+    
+    @staticmethod
+    def compile_search(nombre_busqueda: str) -> Callable[[str], bool]:
+        """
+        Compiles a search pattern once into a name matcher
         
-        # Reemplazar los wildcards escapados por sus equivalentes regex
-        # * = cualquier secuencia de caracteres (0 o más)
-        # % = uno o más caracteres (más flexible que solo uno)
-        patron_escaped = patron_escaped.replace(r'\*', '.*')
-        patron_escaped = patron_escaped.replace(r'\%', '.+')
+        The returned function tells whether a filename matches the pattern
+        with the same rules as matches_search; the pattern is lowercased,
+        split and compiled only the first time it is seen.
+        """
+        coincide = _compile_search(nombre_busqueda)
         
-        # También manejar si el usuario usa * o % sin escapar
-        patron_escaped = patron_escaped.replace('*', '.*')
-        patron_escaped = patron_escaped.replace('%', '.+')
+        def matcher(nombre: str) -> bool:
+            nombre_lower = nombre.lower()
+            return coincide(nombre_lower, os.path.splitext(nombre_lower)[0])
         
-        return patron_escaped
+        return matcher
     
     @staticmethod
     def matches_search(nombre: str, nombre_busqueda: Optional[str] = None, 
-                      tipos_permitidos: Optional[List[str]] = None) -> bool:
+                      tipos_permitidos: Optional[Collection[str]] = None) -> bool:
         """Checks if a file matches search criteria using wildcards"""
         if not nombre:
             return False
         
         nombre_lower = nombre.lower()
+        nombre_sin_ext, nombre_ext = os.path.splitext(nombre_lower)
         
-        # Si hay búsqueda específica por nombre
+        # Si hay tipos permitidos, descartar primero por extensión (lo más barato)
+        if tipos_permitidos and nombre_ext.lstrip('.') not in tipos_permitidos:
+            return False
+        
+        # Si hay búsqueda específica por nombre (patrón compilado y cacheado)
         if nombre_busqueda:
-            busqueda_lower = nombre_busqueda.lower()
-            
-            # Separar nombre y extensión del patrón de búsqueda
-            busqueda_sin_ext, busqueda_ext = os.path.splitext(busqueda_lower)
-            nombre_sin_ext, nombre_ext = os.path.splitext(nombre_lower)
-            
-            # Verificar si el patrón contiene wildcards
-            tiene_wildcards = '*' in busqueda_lower or '%' in busqueda_lower
-            
-            if tiene_wildcards:
-                # Usar regex para búsqueda con wildcards
-                if busqueda_ext:
-                    # Convertir wildcards a regex
-                    patron_regex = FilterService.convert_wildcard_to_regex(busqueda_lower)
-                    if patron_regex:
-                        try:
-                            if re.match(f'^{patron_regex}$', nombre_lower, re.IGNORECASE):
-                                return True
-                        except:
-                            pass
-                else:
-                    # Solo buscar en el nombre (sin extensión)
-                    patron_regex = FilterService.convert_wildcard_to_regex(busqueda_sin_ext)
-                    if patron_regex:
-                        try:
-                            if re.match(f'^{patron_regex}$', nombre_sin_ext, re.IGNORECASE):
-                                return True
-                        except:
-                            pass
-            else:
-                # Búsqueda simple sin wildcards (búsqueda parcial)
-                if busqueda_ext:
-                    # Si incluye extensión, buscar en nombre completo
-                    if busqueda_lower == nombre_lower or busqueda_lower in nombre_lower:
-                        return True
-                else:
-                    # Si no incluye extensión, buscar solo en el nombre (sin extensión)
-                    # Pero también permitir búsqueda parcial
-                    if busqueda_sin_ext in nombre_sin_ext or busqueda_sin_ext in nombre_lower:
-                        return True
-                    # También buscar si el nombre empieza con el patrón
-                    if nombre_sin_ext.startswith(busqueda_sin_ext):
-                        return True
-        
-        # Si hay tipos permitidos, verificar extensión
-        if tipos_permitidos:
-            ext = os.path.splitext(nombre_lower)[1].lstrip('.')
-            if ext not in tipos_permitidos:
-                return False
+            return _compile_search(nombre_busqueda)(nombre_lower, nombre_sin_ext)
         
         return True
     
     @staticmethod
-    def apply_filters(nombre: str, datos: bytes, tipos_archivo: Optional[List[str]] = None,
+    def apply_filters(nombre: str, datos: bytes, tipos_archivo: Optional[Collection[str]] = None,
                      nombre_busqueda: Optional[str] = None, filtrar_sistema: bool = True):
         """Applies all filters to a file before saving it"""
         if not nombre:
             return False, None
         
-        # 1. Filtrar archivos del sistema
-        if filtrar_sistema and SystemFiles.is_system_file(nombre):
-            return False, None
-        
-        # 1.5. Filtrar archivos de directorios del sistema y programas instalados
-        if filtrar_sistema and SystemDirectories.is_system_directory(nombre):
-            return False, None
+        if filtrar_sistema:
+            # Normalizar el nombre una sola vez para ambos filtros
+            nombre_lower = nombre.lower()
+            
+            # 1. Filtrar archivos del sistema
+            if SystemFiles.is_system_file_lower(nombre_lower):
+                return False, None
+            
+            # 1.5. Filtrar archivos de directorios del sistema y programas instalados
+            if SystemDirectories.is_system_directory_normalized(nombre_lower.replace('/', '\\')):
+                return False, None
         
         # 2. Detectar tipo de archivo
         tipo_detectado = DetectionService.detect_file_type(datos) if datos else None
@@ -137,4 +211,55 @@ class FilterService:
             return False, tipo_detectado
         
         return True, tipo_detectado
-
+    
+    @staticmethod
+    def build_filter(tipos_archivo: Optional[Collection[str]] = None,
+                     nombre_busqueda: Optional[str] = None,
+                     filtrar_sistema: bool = True) -> Callable[..., Tuple[bool, Optional[str]]]:
+        """
+        Builds the equivalent of apply_filters for fixed filter settings
+        
+        The settings do not change during a scan, so they are resolved once and
+        the returned function only runs the checks that apply. It is called as
+        filtro(nombre, datos[, tipo_detectado]) and returns the same tuple as
+        apply_filters; passing tipo_detectado skips detecting the type again.
+        """
+        tipos = frozenset(tipos_archivo) if tipos_archivo else None
+        detectar = DetectionService.detect_file_type
+        es_archivo_sistema = SystemFiles.is_system_file_lower
+        es_directorio_sistema = SystemDirectories.is_system_directory_normalized
+        coincide = FilterService.compile_search(nombre_busqueda) if nombre_busqueda else None
+        splitext = os.path.splitext
+        
+        def filtro(nombre, datos, tipo_detectado=_SIN_DETECTAR):
+            if not nombre:
+                return False, None
+            
+            # 1. Filtrar archivos y directorios del sistema
+            if filtrar_sistema:
+                nombre_lower = nombre.lower()
+                if es_archivo_sistema(nombre_lower):
+                    return False, None
+                if es_directorio_sistema(nombre_lower.replace('/', '\\')):
+                    return False, None
+            
+            # 2. Detectar tipo de archivo (si no viene ya detectado)
+            if tipo_detectado is _SIN_DETECTAR:
+                tipo_detectado = detectar(datos) if datos else None
+            
+            # 3. Verificar tipo de archivo permitido (STRICT CHECK)
+            if tipos:
+                # Preferir la extensión del nombre, luego el tipo detectado
+                final_type = splitext(nombre)[1].lstrip('.').lower() or tipo_detectado
+                if not final_type:
+                    return False, None
+                if final_type not in tipos:
+                    return False, tipo_detectado
+            
+            # 4. Verificar búsqueda por nombre
+            if coincide is not None and not coincide(nombre):
+                return False, tipo_detectado
+            
+            return True, tipo_detectado
+        
+        return filtro
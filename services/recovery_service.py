@@ -1,42 +1,114 @@
 """Main file recovery service"""
 
 import os
-from collections import deque
+import queue
+import re
+import threading
 from typing import Optional, List
-from models.config import BLOCK_SIZE, WINDOW_SIZE, OVERLAP, MIN_TEXT_LEN
+from models.config import BLOCK_SIZE, WINDOW_SIZE, OVERLAP, MIN_TEXT_LEN, CODIFICACIONES
+from models.preview_list import PreviewList
 from models.resource_config import ResourceConfig
 from services.detection_service import DetectionService
 from services.filter_service import FilterService
-from utils.encoding_utils import is_text, detect_encoding
+from utils.encoding_utils import is_text_counted, detect_encoding, count_printable
 from utils.file_utils import clean_filename, extract_filename_from_content
+from utils.hash_utils import HashSet64
+from utils.text_score import printable_counts
+
+try:
+    import xxhash
+    XXHASH_AVAILABLE = True
+except ImportError:
+    XXHASH_AVAILABLE = False
+
+try:
+    import cchardet
+    CCHARDET_AVAILABLE = True
+except ImportError:
+    CCHARDET_AVAILABLE = False
+
+# Blocks read per batch by the reader thread, and batches buffered ahead
+READ_BATCH_BLOCKS = 64
+READ_QUEUE_BATCHES = 4
+
+# Offsets scanned inside each block
+OFFSETS = (0, 128, 256, 512, 1024, 2048, 3072)
+
+# Printable bytes are counted once per block in chunks of this size; every
+# window start/end (OVERLAP, WINDOW_SIZE and OFFSETS) is a multiple of it
+TEXT_COUNT_STEP = 128
+
+# Words of 3+ letters kept when reconstructing fragmented text
+_WORD_RE = re.compile(r'[a-zA-ZáéíóúÁÉÍÓÚñÑ]{3,}')
+
+# Candidates are deduplicated by a hash of their first raw bytes,
+# so repeated data is skipped before it is decoded
+DEDUP_PREFIX = 256
+
+if XXHASH_AVAILABLE:
+    def _dedup_hash(data):
+        """64-bit xxh3 hash of a raw byte buffer"""
+        return xxhash.xxh3_64_intdigest(data)
+else:
+    def _dedup_hash(data):
+        """Builtin hash of a raw byte buffer"""
+        return hash(data)
+
+
+def _read_full(fd, size):
+    """Reads up to size bytes, retrying short reads until the end of the disk"""
+    data = os.read(fd, size)
+    if len(data) == size or not data:
+        return data
+    
+    chunks = [data]
+    remaining = size - len(data)
+    while remaining:
+        chunk = os.read(fd, remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
 
 
 class RecoveryService:
     """Service for recovering files from disks"""
     
-    def __init__(self, progress_callback=None, resource_config=None):
+    def __init__(self, progress_callback=None, resource_config=None, message_callback=None):
         """
         Initializes the recovery service
         
         Args:
             progress_callback: Callback function to report progress
             resource_config: ResourceConfig object for resource management
+            message_callback: Callback that shows a per-file message (default: print)
         """
         self.progress_callback = progress_callback
+        self.message_callback = message_callback or print
         self.resource_config = resource_config or ResourceConfig.create_balanced_mode()
-        self.unique_texts = set()
+        self.unique_texts = HashSet64()
         # Calculate max unique texts based on available memory
-        # Each hash is ~24 bytes, so we can store many with limited memory
+        # Each hash takes at most 16 bytes in the compact table (8 bytes at <=50% load)
         # With more memory, we can store more hashes = less cleanup = faster processing
         max_memory_mb = self.resource_config.max_memory_mb or 4096
-        # Scale with memory: ~2M hashes per GB (more aggressive with more memory)
-        max_unique_texts = int((max_memory_mb / 1024) * 2000000)  # ~2M per GB
+        # Scale with memory: ~8M hashes per GB (~128 MB of table per GB of budget)
+        max_unique_texts = int((max_memory_mb / 1024) * 8000000)  # ~8M per GB
         self.max_unique_texts = max(100000, min(max_unique_texts, 50000000))  # Between 100K and 50M
-        self.block_buffer = deque(maxlen=self.resource_config.buffer_size)
+        # Ring of the last buffer_size blocks for fragmented reconstruction.
+        # Each block is written twice (slot i and slot i + buffer_size), so the
+        # buffered blocks are always one contiguous, in-order slice of the arena
+        self._ring_slots = self.resource_config.buffer_size
+        self._ring = bytearray(2 * self._ring_slots * BLOCK_SIZE)
+        self._ring_view = memoryview(self._ring)
+        self._ring_count = 0
+        self._ring_next = 0
         self.found_count = 0
         self.blocks = 0
         self.cancelled = False
         self.last_cleanup_blocks = 0
+        # Next numeric suffix to try for each output filename
+        self._used_names = {}
         # Dynamic cleanup interval: more memory = less frequent cleanups = faster
         # Scale cleanup interval with memory: ~100K blocks per GB
         self.cleanup_interval = max(50000, min(500000, int((max_memory_mb / 1024) * 100000)))
@@ -70,76 +142,81 @@ class RecoveryService:
                 raise ValueError(f"Could not create output directory '{output_dir}': {e}")
         
         self.preview_mode = preview_mode
-        self.preview_list = []  # List to store preview results
+        self.preview_list = PreviewList()  # Files found (preview results)
+        
+        # Allowed types are checked for every candidate file: use O(1) lookups
+        file_types = frozenset(file_types) if file_types else None
+        
+        # Filter settings are fixed for the whole scan: resolve them once
+        self._filter = FilterService.build_filter(file_types, search_pattern, filter_system)
+        # Any ".ext" of an allowed type, to pre-filter candidates before name extraction
+        self._allowed_ext_re = re.compile(
+            '|'.join(re.escape(f'.{file_type}') for file_type in sorted(file_types or ())),
+            re.IGNORECASE
+        ) if file_types else None
         
         self.found_count = 0
         self.blocks = 0
         self.unique_texts.clear()
-        self.block_buffer.clear()
+        self._ring_count = 0
+        self._ring_next = 0
+        self._used_names.clear()
         self.cancelled = False
         
+        is_physical = disk_path.startswith(r"\\.\PhysicalDrive")
+        
         try:
-            with open(disk_path, "rb") as disk:
-                while True:
+            fd = os.open(disk_path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+            try:
+                # The scan reads the whole disk once, front to back
+                if hasattr(os, 'posix_fadvise'):
                     try:
-                        block = disk.read(BLOCK_SIZE)
-                        if not block:
+                        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                
+                # Disk reads run on a dedicated thread so the next batch is
+                # being read while the current one is scanned
+                block_queue = queue.Queue(maxsize=READ_QUEUE_BATCHES)
+                stop_reading = threading.Event()
+                reader = threading.Thread(
+                    target=self._read_blocks,
+                    args=(fd, is_physical, block_queue, stop_reading),
+                    daemon=True
+                )
+                reader.start()
+                
+                try:
+                    while not self.cancelled:
+                        # Wake up periodically so a cancel is noticed even
+                        # while the reader is waiting on a slow disk
+                        try:
+                            batch = block_queue.get(timeout=0.1)
+                        except queue.Empty:
+                            continue
+                        if batch is None:
                             break
-                    except (OSError, IOError):
-                        # For physical disks, there may be errors
-                        if disk_path.startswith(r"\\.\PhysicalDrive"):
-                            try:
-                                disk.seek(BLOCK_SIZE, 1)
-                                continue
-                            except:
+                        if isinstance(batch, BaseException):
+                            raise batch
+                        
+                        for current_position, block, counts in batch:
+                            # Check if cancelled
+                            if self.cancelled:
                                 break
-                        else:
-                            raise
-                    
-                    # Check if cancelled
-                    if self.cancelled:
-                        break
-                    
-                    current_position = self.blocks * BLOCK_SIZE
-                    
-                    # Method 1: Direct block scan
-                    self._process_block(block, current_position, output_dir, 
-                                      file_types, search_pattern, filter_system)
-                    
-                    # Method 2: Sliding window
-                    self._process_sliding_window(block, current_position, output_dir,
-                                                file_types, search_pattern, filter_system)
-                    
-                    # Method 3: Fragmented reconstruction
-                    self._process_fragmented(block, disk_path, current_position, output_dir,
-                                           file_types, search_pattern, filter_system)
-                    
-                    # Method 4: Offset scan (every 10 blocks)
-                    if self.blocks % 10 == 0:
-                        self._process_offset_scan(block, current_position, output_dir,
-                                                 file_types, search_pattern, filter_system)
-                    
-                    self.blocks += 1
-                    
-                    # Periodic cleanup of unique_texts to prevent excessive memory growth
-                    if self.blocks - self.last_cleanup_blocks >= self.cleanup_interval:
-                        self._cleanup_memory()
-                        self.last_cleanup_blocks = self.blocks
-                    
-                    # Check resource limits
-                    if not self.resource_config.should_continue():
-                        # Try cleanup before raising error
-                        self._cleanup_memory()
-                        if not self.resource_config.should_continue():
-                            raise MemoryError(f"Memory limit exceeded ({self.resource_config.max_memory_mb} MB)")
-                    
-                    # Apply block delay if configured
-                    self.resource_config.apply_block_delay()
-                    
-                    # Report progress
-                    if self.blocks % 1000 == 0 and self.progress_callback:
-                        memory_usage = self.resource_config.get_memory_usage_mb()
-                        self.progress_callback(self.blocks, current_position, self.found_count, memory_usage)
+                            
+                            self._scan_block(block, disk_path, current_position, output_dir,
+                                             file_types, search_pattern, filter_system, counts)
+                finally:
+                    stop_reading.set()
+                    # Drop pending batches so a reader waiting to queue one exits at once
+                    while True:
+                        try:
+                            block_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                    reader.join()
+            finally:
+                os.close(fd)
         
         except PermissionError:
             raise PermissionError("PERMISSION DENIED. Run as ADMINISTRATOR")
@@ -148,6 +225,141 @@ class RecoveryService:
         
         return self.found_count
     
+    def _read_blocks(self, fd, is_physical, block_queue, stop_reading):
+        """
+        Reader thread: reads the disk in batches of (position, block, counts)
+        
+        Each batch is fetched with a single read of READ_BATCH_BLOCKS blocks,
+        and counts holds the printable byte counts of each block.
+        Puts each batch in block_queue, then None at the end of the disk. If a
+        read fails the exception is queued instead so the scan can raise it.
+        """
+        def put(item):
+            # Never block forever: the scanner may stop consuming at any time
+            while not stop_reading.is_set():
+                try:
+                    block_queue.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+        
+        position = 0
+        try:
+            end_of_disk = False
+            while not end_of_disk and not stop_reading.is_set():
+                try:
+                    data = _read_full(fd, READ_BATCH_BLOCKS * BLOCK_SIZE)
+                except (OSError, IOError):
+                    # For physical disks, there may be errors: retry the batch
+                    # block by block and skip only the unreadable ones
+                    if not is_physical:
+                        raise
+                    batch, position, end_of_disk = self._read_blocks_one_by_one(fd, position)
+                else:
+                    if len(data) < READ_BATCH_BLOCKS * BLOCK_SIZE:
+                        end_of_disk = True
+                    batch = [(position + offset, data[offset:offset + BLOCK_SIZE])
+                             for offset in range(0, len(data), BLOCK_SIZE)]
+                    position += len(data)
+                
+                if batch:
+                    # Classify the bytes of each block here, overlapping with the
+                    # scan of the previous batch (the numba kernel releases the GIL)
+                    batch = [(block_position, block, printable_counts(block, TEXT_COUNT_STEP))
+                             for block_position, block in batch]
+                    if not put(batch):
+                        return
+        except Exception as e:
+            put(e)
+            return
+        put(None)
+    
+    def _read_blocks_one_by_one(self, fd, position):
+        """Reads one batch block by block from position, skipping unreadable blocks"""
+        batch = []
+        end_of_disk = False
+        while len(batch) < READ_BATCH_BLOCKS:
+            try:
+                os.lseek(fd, position, os.SEEK_SET)
+            except OSError:
+                end_of_disk = True
+                break
+            
+            try:
+                block = _read_full(fd, BLOCK_SIZE)
+            except (OSError, IOError):
+                position += BLOCK_SIZE
+                continue
+            
+            if not block:
+                end_of_disk = True
+                break
+            batch.append((position, block))
+            position += len(block)
+        
+        # Leave the descriptor where the next batch starts
+        if not end_of_disk:
+            try:
+                os.lseek(fd, position, os.SEEK_SET)
+            except OSError:
+                end_of_disk = True
+        
+        return batch, position, end_of_disk
+    
+    def _scan_block(self, block: bytes, disk_path: str, current_position: int, output_dir: str,
+                    file_types: Optional[List[str]], search_pattern: Optional[str],
+                    filter_system: bool, counts: Optional[List[int]] = None):
+        """Runs every scanning method on a block and handles resources and progress"""
+        # Classify each byte of the block once for all the text checks
+        if counts is None:
+            counts = printable_counts(block, TEXT_COUNT_STEP)
+        
+        # Method 1: Direct block scan
+        self._process_block(block, current_position, output_dir, 
+                          file_types, search_pattern, filter_system, counts)
+        
+        # A window only passes is_text with at least half of its bytes printable,
+        # so a full block with fewer printable bytes than that has no text window
+        # (mostly binary or zeroed blocks skip methods 2 and 4)
+        may_have_text = len(block) < BLOCK_SIZE or counts[-1] * 2 >= WINDOW_SIZE
+        
+        # Method 2: Sliding window
+        if may_have_text:
+            self._process_sliding_window(block, current_position, output_dir,
+                                        file_types, search_pattern, filter_system, counts)
+        
+        # Method 3: Fragmented reconstruction (combines blocks, so it always runs)
+        self._process_fragmented(block, disk_path, current_position, output_dir,
+                               file_types, search_pattern, filter_system)
+        
+        # Method 4: Offset scan (every 10 blocks)
+        if self.blocks % 10 == 0 and may_have_text:
+            self._process_offset_scan(block, current_position, output_dir,
+                                     file_types, search_pattern, filter_system, counts)
+        
+        self.blocks += 1
+        
+        # Periodic cleanup of unique_texts to prevent excessive memory growth
+        if self.blocks - self.last_cleanup_blocks >= self.cleanup_interval:
+            self._cleanup_memory()
+            self.last_cleanup_blocks = self.blocks
+        
+        # Check resource limits
+        if not self.resource_config.should_continue():
+            # Try cleanup before raising error
+            self._cleanup_memory()
+            if not self.resource_config.should_continue(force=True):
+                raise MemoryError(f"Memory limit exceeded ({self.resource_config.max_memory_mb} MB)")
+        
+        # Apply block delay if configured
+        self.resource_config.apply_block_delay()
+        
+        # Report progress
+        if self.blocks % 1000 == 0 and self.progress_callback:
+            memory_usage = self.resource_config.get_memory_usage_mb()
+            self.progress_callback(self.blocks, current_position, self.found_count, memory_usage)
+    
     def cancel(self):
         """Cancels the recovery process"""
         self.cancelled = True
@@ -156,41 +368,52 @@ class RecoveryService:
         """Cleans up memory by reducing unique_texts set if it's too large"""
         if len(self.unique_texts) > self.max_unique_texts:
             # If set is too large, keep only a portion to free memory
-            # Since sets don't have order, we'll keep a random sample
+            # The table is rebuilt in place with a hash-ordered (effectively random) sample
             # This is acceptable because we're just preventing duplicates, not tracking history
             keep_count = int(self.max_unique_texts * 0.7)  # Keep 70% of max
-            if keep_count < len(self.unique_texts):
-                # Convert to list, take sample, convert back to set
-                unique_list = list(self.unique_texts)
-                # Keep a random sample (or last N if we want some determinism)
-                # For simplicity, keep the last N entries
-                self.unique_texts = set(unique_list[-keep_count:])
+            self.unique_texts.shrink(keep_count)
     
     def _process_block(self, block: bytes, position: int, output_dir: str,
                       file_types: Optional[List[str]], search_pattern: Optional[str],
-                      filter_system: bool):
+                      filter_system: bool, counts: Optional[List[int]] = None):
         """Processes a block directly"""
-        if is_text(block, threshold=0.7):
-            encoding, text = detect_encoding(block)
-            if text:
-                text_hash = hash(text[:100])
-                if text_hash not in self.unique_texts:
-                    self.unique_texts.add(text_hash)
+        if counts is None:
+            counts = printable_counts(block, TEXT_COUNT_STEP)
+        if is_text_counted(block, counts[-1], threshold=0.7):
+            # One probe: add() reports whether the prefix was new. A prefix that
+            # does not decode is marked too, like any other repeat of that prefix
+            if self.unique_texts.add(_dedup_hash(block[:DEDUP_PREFIX])):
+                encoding, text = detect_encoding(block)
+                if text:
                     self._save_file(block, text, position, output_dir,
                                   file_types, search_pattern, filter_system, "")
     
     def _process_sliding_window(self, block: bytes, position: int, output_dir: str,
                                file_types: Optional[List[str]], search_pattern: Optional[str],
-                               filter_system: bool):
+                               filter_system: bool, counts: Optional[List[int]] = None):
         """Processes using sliding window"""
-        for start in range(0, len(block) - WINDOW_SIZE, OVERLAP):
-            window = block[start:start + WINDOW_SIZE]
-            if is_text(window, threshold=0.6):
-                encoding, text = detect_encoding(window)
-                if text and len(text.strip()) >= MIN_TEXT_LEN:
-                    text_hash = hash(text[:100])
-                    if text_hash not in self.unique_texts:
-                        self.unique_texts.add(text_hash)
+        if counts is None:
+            counts = printable_counts(block, TEXT_COUNT_STEP)
+        
+        # Hot loop: bind globals and bound methods to locals once
+        count = count_printable
+        looks_like_text = is_text_counted
+        dedup_hash = _dedup_hash
+        add_hash = self.unique_texts.add
+        window_size = WINDOW_SIZE
+        step = TEXT_COUNT_STEP
+        min_printable = window_size // 2
+        
+        for start in range(0, len(block) - window_size, OVERLAP):
+            validos = count(counts, step, start, start + window_size)
+            # No window below half printable passes is_text: skip it before slicing
+            if validos < min_printable:
+                continue
+            window = block[start:start + window_size]
+            if looks_like_text(window, validos, 0.6):
+                if add_hash(dedup_hash(window[:DEDUP_PREFIX])):
+                    encoding, text = detect_encoding(window)
+                    if text and len(text.strip()) >= MIN_TEXT_LEN:
                         self._save_file(window, text, position + start, output_dir,
                                       file_types, search_pattern, filter_system, "")
     
@@ -198,66 +421,132 @@ class RecoveryService:
                            file_types: Optional[List[str]], search_pattern: Optional[str],
                            filter_system: bool):
         """Processes fragmented text"""
-        self.block_buffer.append(block)
-        if len(self.block_buffer) >= 2:
-            combined_data = b''.join(self.block_buffer)
+        combined_data = self._append_to_ring(block)
+        if combined_data is not None:
             reconstructed_text = self._reconstruct_text(combined_data)
             if reconstructed_text:
-                text_hash = hash(reconstructed_text[:100])
-                if text_hash not in self.unique_texts:
-                    self.unique_texts.add(text_hash)
-                    self._save_file(combined_data, reconstructed_text, position - BLOCK_SIZE,
+                # Reconstructed text is a join of the words found, so it is
+                # keyed on its own start rather than on the raw bytes
+                text_hash = _dedup_hash(reconstructed_text[:DEDUP_PREFIX].encode("utf-8"))
+                if self.unique_texts.add(text_hash):
+                    self._save_file(bytes(combined_data), reconstructed_text, position - BLOCK_SIZE,
                                   output_dir, file_types, search_pattern, filter_system, "frag_")
     
+    def _append_to_ring(self, block: bytes) -> Optional[memoryview]:
+        """
+        Adds a block to the ring and returns a view of the buffered blocks in order
+        
+        Returns None until at least two blocks are buffered. The view is only
+        valid until the next call.
+        """
+        slots = self._ring_slots
+        if slots < 2:
+            return None
+        
+        size = len(block)
+        slot = self._ring_next
+        start = slot * BLOCK_SIZE
+        self._ring_view[start:start + size] = block
+        start += slots * BLOCK_SIZE
+        self._ring_view[start:start + size] = block
+        
+        self._ring_next = (slot + 1) % slots
+        if self._ring_count < slots:
+            self._ring_count += 1
+        if self._ring_count < 2:
+            return None
+        
+        # Oldest block first; only the newest one may be shorter than BLOCK_SIZE
+        oldest = (self._ring_next - self._ring_count) % slots
+        start = oldest * BLOCK_SIZE
+        end = start + (self._ring_count - 1) * BLOCK_SIZE + size
+        return self._ring_view[start:end]
+    
     def _process_offset_scan(self, block: bytes, position: int, output_dir: str,
                             file_types: Optional[List[str]], search_pattern: Optional[str],
-                            filter_system: bool):
+                            filter_system: bool, counts: Optional[List[int]] = None):
         """Processes with offset scan"""
-        for offset in [0, 128, 256, 512, 1024, 2048, 3072]:
-            if offset < len(block):
-                sub_block = block[offset:offset + WINDOW_SIZE]
-                if is_text(sub_block, threshold=0.65):
-                    encoding, text = detect_encoding(sub_block)
-                    if text:
-                        text_hash = hash(text[:100])
-                        if text_hash not in self.unique_texts:
-                            self.unique_texts.add(text_hash)
+        if counts is None:
+            counts = printable_counts(block, TEXT_COUNT_STEP)
+        
+        # Bind globals and bound methods to locals once for the loop
+        count = count_printable
+        looks_like_text = is_text_counted
+        dedup_hash = _dedup_hash
+        add_hash = self.unique_texts.add
+        window_size = WINDOW_SIZE
+        step = TEXT_COUNT_STEP
+        block_len = len(block)
+        
+        for offset in OFFSETS:
+            if offset < block_len:
+                sub_block = block[offset:offset + window_size]
+                validos = count(counts, step, offset, offset + window_size)
+                if looks_like_text(sub_block, validos, 0.65):
+                    if add_hash(dedup_hash(sub_block[:DEDUP_PREFIX])):
+                        encoding, text = detect_encoding(sub_block)
+                        if text:
                             self._save_file(sub_block, text, position + offset, output_dir,
                                           file_types, search_pattern, filter_system, "offset_")
     
-    def _reconstruct_text(self, data: bytes) -> Optional[str]:
+    def _reconstruct_text(self, data) -> Optional[str]:
         """Reconstructs fragmented text"""
-        from models.config import CODIFICACIONES
-        import re
+        # With cchardet, decode once with the detected encoding when it is confident
+        if CCHARDET_AVAILABLE:
+            guess = cchardet.detect(bytes(data))
+            encoding = guess.get('encoding')
+            if encoding and (guess.get('confidence') or 0) >= 0.5:
+                try:
+                    return self._join_words(str(data, encoding, "ignore"))
+                except LookupError:
+                    pass
         
         best_text = None
         best_length = 0
         
         for encoding in CODIFICACIONES:
             try:
-                text = data.decode(encoding, errors="ignore")
-                words = re.findall(r'[a-zA-ZáéíóúÁÉÍÓÚñÑ]{3,}', text)
-                if len(words) >= 10:
-                    clean_text = ' '.join(words)
-                    if len(clean_text) >= MIN_TEXT_LEN:
-                        if len(clean_text) > best_length:
-                            best_length = len(clean_text)
-                            best_text = clean_text
+                text = str(data, encoding, "ignore")
             except:
                 continue
+            
+            # The joined words are never longer than the decoded text
+            if len(text) < MIN_TEXT_LEN or len(text) <= best_length:
+                continue
+            clean_text = self._join_words(text)
+            if clean_text and len(clean_text) > best_length:
+                best_length = len(clean_text)
+                best_text = clean_text
         
         return best_text
     
+    def _join_words(self, text: str) -> Optional[str]:
+        """Joins the words found in text if there are enough of them to be useful"""
+        words = _WORD_RE.findall(text)
+        if len(words) >= 10:
+            clean_text = ' '.join(words)
+            if len(clean_text) >= MIN_TEXT_LEN:
+                return clean_text
+        return None
+    
     def _save_file(self, data: bytes, text: str, position: int, output_dir: str,
                   file_types: Optional[List[str]], search_pattern: Optional[str],
                   filter_system: bool, prefix: str):
         """Saves a file if it passes filters"""
+        # Detect type (magic bytes) first: it is cheap and decides most type filters
+        detected_type = DetectionService.detect_file_type(data)
+        
+        # With a type filter, the final type is the extension of the chosen name:
+        # detected_type (or txt) for generic names, or the extension of a name
+        # found in the text, which always appears there as ".ext". If neither
+        # can be an allowed type, skip the name extraction and filters entirely
+        if file_types and (detected_type or 'txt') not in file_types:
+            if not self._allowed_ext_re.search(text):
+                return
+        
         # Try to get original name FIRST - this is the priority
         original_name = extract_filename_from_content(text, data)
         
-        # Detect type
-        detected_type = DetectionService.detect_file_type(data)
-        
         # Determine filename: PRIORITY to original name if available
         filename = None
         
@@ -270,17 +559,20 @@ class RecoveryService:
                     # Add extension based on detected type
                     clean_name += f'.{detected_type or "txt"}'
                 filename = clean_name
-            else:
-                # Original name couldn't be cleaned, use generic
+        
+        # No usable original name: use a generic name. It is only numbered once
+        # the file passes the filters, unless a name search needs the real name;
+        # the unnumbered stand-in has the same prefix and extension, so the system
+        # and type filters give the same result for it
+        generic = filename is None
+        if generic:
+            if search_pattern:
                 filename = f"{prefix}recovered_{self.found_count:05d}.{detected_type or 'txt'}"
-        else:
-            # No original name found - use generic name
-            filename = f"{prefix}recovered_{self.found_count:05d}.{detected_type or 'txt'}"
+            else:
+                filename = f"{prefix}recovered.{detected_type or 'txt'}"
         
         # Apply filters
-        passes_filters, filter_type = FilterService.apply_filters(
-            filename, data, file_types, search_pattern, filter_system
-        )
+        passes_filters, filter_type = self._filter(filename, data, detected_type)
         
         if not passes_filters:
             return
@@ -307,65 +599,76 @@ class RecoveryService:
             if final_type not in file_types:
                 return
         
+        if generic and not search_pattern:
+            filename = f"{prefix}recovered_{self.found_count:05d}.{detected_type or 'txt'}"
+        
         if not detected_type and filter_type:
             detected_type = filter_type
         
-        # Create file info for tracking
-        file_info = {
-            'filename': filename,
-            'original_name': original_name,
-            'type': detected_type or 'txt',
-            'size': len(text),
-            'position': position
-        }
+        # Track the file (one entry per column, no dict per file)
+        self.preview_list.append(filename, original_name, detected_type or 'txt',
+                                 len(text), position)
         
         # In preview mode, just add to list and return
+        # (in recover mode it is also tracked for cancellation display)
         if self.preview_mode:
-            self.preview_list.append(file_info)
             self.found_count += 1
             return
         
-        # In recover mode, also track in preview_list for cancellation display
-        self.preview_list.append(file_info)
-        
         # Save file
         try:
-            base_path = os.path.join(output_dir, filename)
-            counter = 1
-            while os.path.exists(base_path):
-                name_base, ext = os.path.splitext(filename)
-                base_path = os.path.join(output_dir, f"{name_base}_{counter}{ext}")
-                counter += 1
-            
-            with open(base_path, "w", encoding="utf-8") as f:
-                f.write(text)
+            self._write_new_file(output_dir, filename, text.encode("utf-8"))
             
             self.found_count += 1
             # Show message indicating if original name was used
             if original_name:
                 clean_original = clean_filename(original_name)
                 if clean_original and clean_original == filename:
-                    print(f"  ✓ Recovered: {filename} (nombre original detectado)")
+                    self.message_callback(f"  ✓ Recovered: {filename} (nombre original detectado)")
                 else:
-                    print(f"  ✓ Recovered: {filename}")
+                    self.message_callback(f"  ✓ Recovered: {filename}")
             else:
-                print(f"  ✓ Recovered: {filename}")
+                self.message_callback(f"  ✓ Recovered: {filename}")
         except (OSError, IOError, ValueError):
             # If it fails, try with generic name
             try:
                 filename = f"{prefix}recovered_{self.found_count:05d}.txt"
-                base_path = os.path.join(output_dir, filename)
-                counter = 1
-                while os.path.exists(base_path):
-                    name_base, ext = os.path.splitext(filename)
-                    base_path = os.path.join(output_dir, f"{name_base}_{counter}{ext}")
-                    counter += 1
-                with open(base_path, "w", encoding="utf-8") as f:
-                    f.write(text)
+                self._write_new_file(output_dir, filename, text.encode("utf-8"))
                 self.found_count += 1
             except:
                 pass
     
+    def _write_new_file(self, output_dir: str, filename: str, data: bytes) -> str:
+        """
+        Writes data to a new file in output_dir named filename (or name_1, name_2, ...)
+        
+        The file is created with O_EXCL, so an existing file (e.g. from a previous
+        run) is never overwritten and no separate existence check is needed. The
+        next suffix to try is remembered per name, so repeated names usually
+        succeed on the first attempt. Returns the path written.
+        """
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+        counter = self._used_names.get(filename, 0)
+        name_base, ext = os.path.splitext(filename)
+        while True:
+            candidate = filename if counter == 0 else f"{name_base}_{counter}{ext}"
+            base_path = os.path.join(output_dir, candidate)
+            counter += 1
+            try:
+                fd = os.open(base_path, flags, 0o644)
+                break
+            except FileExistsError:
+                continue
+        
+        self._used_names[filename] = counter
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        return base_path
+    
     def get_preview_list(self):
         """Returns the list of files found in preview mode"""
         return self.preview_list
@@ -2,9 +2,13 @@
 
 from .cli import CLI
 
-try:
-    from .gui import GUI
-    __all__ = ['CLI', 'GUI']
-except ImportError:
-    __all__ = ['CLI']
+__all__ = ['CLI', 'GUI']
 
+
+def __getattr__(name):
+    # The GUI (and tkinter) is only imported when it is actually used,
+    # so starting the CLI does not pay for it
+    if name == 'GUI':
+        from .gui import GUI
+        return GUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,19 +1,62 @@
 """Command line interface"""
 
+import os
+import re
+import sys
+import time
+from pathlib import Path
 from typing import Optional, List
-from controllers.recovery_controller import RecoveryController
-from models.config import FileSignatures
-from models.resource_config import ResourceConfig
+
+# File type names in the user's list (separators and spaces are skipped)
+_TYPE_RE = re.compile(r'[a-z0-9]+')
+
+# Message prefixes: emoji on a terminal, plain ASCII when output is piped
+EMOJI_ICONS = {
+    'error': '❌', 'warning': '⚠️ ', 'ok': '✅', 'hint': '👉',
+    'types': '📋', 'search': '🔎', 'filter': '🚫', 'settings': '⚙️ ',
+    'performance': '⚡', 'balanced': '⚖️ ', 'low': '🐢',
+    'progress': '📊', 'scan': '🔍', 'folder': '📁', 'mode': '🔬',
+    'disk': '💾', 'file': '📄',
+}
+ASCII_ICONS = {
+    'error': '[X]', 'warning': '[!]', 'ok': '[OK]', 'hint': '->',
+    'types': '[*]', 'search': '[*]', 'filter': '[*]', 'settings': '[*]',
+    'performance': '[+]', 'balanced': '[=]', 'low': '[-]',
+    'progress': '[*]', 'scan': '[>]', 'folder': '[>]', 'mode': '[>]',
+    'disk': '[#]', 'file': '[#]',
+}
 
 
 class CLI:
     """Command line interface for the file recovery system"""
     
     def __init__(self):
-        self.controller = RecoveryController()
+        self._controller = None
+        self._icons = EMOJI_ICONS
+    
+    @property
+    def controller(self):
+        """Recovery controller, imported on first use so the menu starts instantly"""
+        if self._controller is None:
+            from controllers.recovery_controller import RecoveryController
+            self._controller = RecoveryController()
+        return self._controller
+    
+    def _select_index(self, prompt: str, count: int) -> Optional[int]:
+        """Reads a 1-based list choice and returns its index (None if invalid)"""
+        raw = input(prompt).strip()
+        if raw.isdecimal():
+            idx = int(raw) - 1
+            if 0 <= idx < count:
+                return idx
+        print(f"{self._icons['error']} Invalid selection")
+        return None
     
     def run(self):
         """Runs the CLI interface"""
+        interactive = sys.stdout.isatty()
+        self._icons = icons = EMOJI_ICONS if interactive else ASCII_ICONS
+        
         print("\n===== FILE RECOVERY SYSTEM =====\n")
         print("1. Scan logical drive (C:, D:)")
         print("2. Scan physical drive (PhysicalDrive)\n")
@@ -23,95 +66,92 @@ class CLI:
         if option == "1":
             drives = self.controller.list_logical_drives()
             if not drives:
-                print("❌ No drives detected")
+                print(f"{icons['error']} No drives detected")
                 return
             
             for i, d in enumerate(drives):
                 print(f"{i + 1}. {d}:")
             
-            try:
-                idx = int(input("Select drive: ")) - 1
-                path = rf"\\.\{drives[idx]}:"
-            except:
-                print("❌ Invalid selection")
+            idx = self._select_index("Select drive: ", len(drives))
+            if idx is None:
                 return
+            path = rf"\\.\{drives[idx]}:"
         
         elif option == "2":
-            drives_info = self.controller.list_physical_drives_with_names()
+            # Print each drive as soon as it is read instead of after the whole query
+            drives_info = []
+            for drive in self.controller.iter_physical_drives_with_names():
+                drives_info.append(drive)
+                size_gb = f" ({drive['size'] / (1024**3):.2f} GB)" if drive.get('size') else ""
+                print(f"{len(drives_info)}. {drive['display_name']}{size_gb}")
+            
+            # The simple drive list comes from the same query, so an empty
+            # result means there is nothing to fall back to
             if not drives_info:
-                # Fallback to simple list if detailed info fails
-                drives = self.controller.list_physical_drives()
-                if not drives:
-                    print("❌ No physical drives detected")
-                    return
-                
-                for i, d in enumerate(drives):
-                    print(f"{i + 1}. {d}")
-                
-                try:
-                    idx = int(input("Select physical drive: ")) - 1
-                    path = rf"\\.\{drives[idx]}"
-                except:
-                    print("❌ Invalid selection")
-                    return
-            else:
-                for i, drive in enumerate(drives_info):
-                    model = drive.get('model', 'Unknown')
-                    size_gb = ""
-                    if 'size' in drive and drive['size']:
-                        size_gb = f" ({drive['size'] / (1024**3):.2f} GB)"
-                    print(f"{i + 1}. {drive['display_name']}{size_gb}")
-                
-                try:
-                    idx = int(input("Select physical drive: ")) - 1
-                    selected_drive = drives_info[idx]
-                    path = rf"\\.\{selected_drive['name']}"
-                except:
-                    print("❌ Invalid selection")
-                    return
+                print(f"{icons['error']} No physical drives detected")
+                return
+            
+            idx = self._select_index("Select physical drive: ", len(drives_info))
+            if idx is None:
+                return
+            path = rf"\\.\{drives_info[idx]['name']}"
         
         else:
-            print("❌ Invalid option")
+            print(f"{icons['error']} Invalid option")
             return
         
         output = input("Path to save recovered files: ").strip()
         if not output:
-            print("❌ Invalid path")
+            print(f"{icons['error']} Invalid path")
+            return
+        
+        # Create and resolve the output directory once, so every recovered
+        # file is written under a ready absolute path
+        output_path = Path(output).expanduser()
+        try:
+            output_path.mkdir(parents=True, exist_ok=True)
+        except OSError as e:
+            print(f"{icons['error']} Cannot create output directory: {e}")
             return
+        output = os.fspath(output_path.resolve())
+        if os.name == 'nt' and len(output) > 240 and not output.startswith('\\\\?\\'):
+            # Extended-length prefix so long file paths do not hit MAX_PATH
+            output = '\\\\?\\' + output
         
         # File type configuration
-        print("\n📋 File types to recover:")
+        from models.config import FileSignatures
+        print(f"\n{icons['types']} File types to recover:")
         print("   Available types: " + ", ".join(FileSignatures.get_all_types()))
         print("   (Press Enter to recover ALL types)")
         types_input = input("   Enter types separated by commas (e.g: txt,pdf,doc): ").strip()
         
         file_types = None
         if types_input:
-            file_types = [t.strip().lower() for t in types_input.split(',') if t.strip()]
-            valid_types = FileSignatures.get_all_types()
-            file_types = [t for t in file_types if t in valid_types]
+            valid_types = FileSignatures.ALL_TYPES
+            file_types = [t for t in _TYPE_RE.findall(types_input.lower()) if t in valid_types]
             if not file_types:
-                print("⚠️  No valid types. Will recover ALL types.")
+                print(f"{icons['warning']} No valid types. Will recover ALL types.")
                 file_types = None
         
         # Specific name search
-        print("\n🔎 Specific search:")
+        print(f"\n{icons['search']} Specific search:")
         print("   (Press Enter to search ALL files)")
         print("   You can use wildcards:")
         print("   - * = any sequence of characters (e.g: *pass*.txt)")
-        print("   - % = single character (e.g: %wall%)")
+        print("   - % = one or more characters (e.g: %wall%)")
         print("   - If you don't include extension, searches only in filename")
         search_pattern = input("   Enter search pattern (e.g: *pass*.txt or %wall%): ").strip()
         if not search_pattern:
             search_pattern = None
         
         # System files filter
-        print("\n🚫 System files filter:")
+        print(f"\n{icons['filter']} System files filter:")
         filter_input = input("   Filter system files? (Y/n): ").strip().lower()
         filter_system = filter_input != 'n'
         
         # Resource usage mode
-        print("\n⚙️  Resource usage mode:")
+        from models.resource_config import ResourceConfig
+        print(f"\n{icons['settings']} Resource usage mode:")
         print("   1. Performance (uses all resources - fastest)")
         print("   2. Balanced (moderate resource usage - recommended)")
         print("   3. Low resources (minimal resource usage - slower)")
@@ -120,74 +160,122 @@ class CLI:
         if resource_mode == "1":
             resource_config = ResourceConfig.create_performance_mode()
             mem_gb = resource_config.max_memory_mb / 1024
-            print(f"   ⚡ Performance mode selected (85% RAM = {mem_gb:.1f} GB max)")
+            print(f"   {icons['performance']} Performance mode selected (85% RAM = {mem_gb:.1f} GB max)")
         elif resource_mode == "3":
             resource_config = ResourceConfig.create_low_resource_mode()
             mem_gb = resource_config.max_memory_mb / 1024
-            print(f"   🐢 Low resource mode selected (25% RAM = {mem_gb:.1f} GB max)")
+            print(f"   {icons['low']} Low resource mode selected (25% RAM = {mem_gb:.1f} GB max)")
         else:
             resource_config = ResourceConfig.create_balanced_mode()
             mem_gb = resource_config.max_memory_mb / 1024
-            print(f"   ⚖️  Balanced mode selected (50% RAM = {mem_gb:.1f} GB max)")
+            print(f"   {icons['balanced']} Balanced mode selected (50% RAM = {mem_gb:.1f} GB max)")
         
         # Get disk size
         total_size = self.controller.get_disk_size(path)
         is_physical = path.startswith(r"\\.\PhysicalDrive")
         
-        # Progress callback
-        def progress_callback(blocks, position, found, memory_usage=None):
-            mb_scanned = position / (1024 * 1024)
-            if total_size and total_size > 0:
-                percentage = (position / total_size) * 100
-                mb_total = total_size / (1024 * 1024)
-                mem_info = f" | Memory: {memory_usage:.1f} MB" if memory_usage else ""
-                print(f"📊 Blocks: {blocks:,} | Progress: {percentage:.2f}% | "
-                      f"Scanned: {mb_scanned:.1f} MB / {mb_total:.1f} MB | "
-                      f"Found: {found}{mem_info}")
+        # Progress callback: at most once per progress_interval, rewrites a single
+        # line on a terminal and prints plain lines when output is piped
+        progress_interval = resource_config.progress_interval
+        last_update = 0.0
+        last_width = 0
+        last_line = ""
+        
+        # Loop invariants, computed once and bound as default arguments
+        inv_mb = 1.0 / (1024 * 1024)
+        mb_total = total_size * inv_mb if total_size and total_size > 0 else None
+        inv_percent = 100.0 / total_size if mb_total is not None else None
+        
+        def progress_callback(blocks, position, found, memory_usage=None,
+                              _inv_mb=inv_mb, _mb_total=mb_total, _inv_percent=inv_percent,
+                              _interval=progress_interval, _monotonic=time.monotonic,
+                              _icon=icons['progress'], _interactive=interactive):
+            nonlocal last_update, last_width, last_line
+            now = _monotonic()
+            if now - last_update < _interval and position != total_size:
+                return
+            last_update = now
+            
+            mb_scanned = position * _inv_mb
+            mem_info = f" | Memory: {memory_usage:.1f} MB" if memory_usage else ""
+            if _inv_percent is not None:
+                percentage = position * _inv_percent
+                line = (f"{_icon} Blocks: {blocks:,} | Progress: {percentage:.2f}% | "
+                        f"Scanned: {mb_scanned:.1f} MB / {_mb_total:.1f} MB | "
+                        f"Found: {found}{mem_info}")
             else:
-                mem_info = f" | Memory: {memory_usage:.1f} MB" if memory_usage else ""
-                print(f"📊 Blocks: {blocks:,} | Scanned: {mb_scanned:.1f} MB | "
-                      f"Found: {found}{mem_info}")
+                line = (f"{_icon} Blocks: {blocks:,} | Scanned: {mb_scanned:.1f} MB | "
+                        f"Found: {found}{mem_info}")
+            
+            if not _interactive:
+                print(line, flush=True)
+                return
+            
+            # Pad over the previous line in case this one is shorter
+            sys.stdout.write(line.ljust(last_width) + "\r")
+            sys.stdout.flush()
+            last_width = len(line)
+            last_line = line
+        
+        def message_callback(message):
+            # Clear the progress line so the message is not printed over it,
+            # then redraw the progress below the message (only on a terminal,
+            # where last_width is set)
+            if last_width:
+                sys.stdout.write("\r" + " " * last_width + "\r")
+            print(message)
+            if last_line:
+                sys.stdout.write(last_line + "\r")
+                sys.stdout.flush()
         
         # Show initial information
-        print(f"\n🔍 Deep scan started: {path}")
-        print(f"📁 Saving to: {output}")
-        print(f"🔬 Mode: Complex deep scan")
+        print(f"\n{icons['scan']} Deep scan started: {path}")
+        print(f"{icons['folder']} Saving to: {output}")
+        print(f"{icons['mode']} Mode: Complex deep scan")
         if file_types:
-            print(f"📋 File types: {', '.join(file_types)}")
+            print(f"{icons['types']} File types: {', '.join(file_types)}")
         else:
-            print(f"📋 File types: ALL")
+            print(f"{icons['types']} File types: ALL")
         if search_pattern:
-            print(f"🔎 Specific search: {search_pattern}")
+            print(f"{icons['search']} Specific search: {search_pattern}")
         if filter_system:
-            print(f"🚫 System files filter: ENABLED")
+            print(f"{icons['filter']} System files filter: ENABLED")
         if total_size:
-            print(f"💾 Disk size: {total_size / (1024*1024*1024):.2f} GB")
+            print(f"{icons['disk']} Disk size: {total_size / (1024*1024*1024):.2f} GB")
         if resource_config.max_memory_mb:
             mem_gb = resource_config.max_memory_mb / 1024
-            print(f"💾 Memory limit: {resource_config.max_memory_mb} MB ({mem_gb:.1f} GB)")
+            print(f"{icons['disk']} Memory limit: {resource_config.max_memory_mb} MB ({mem_gb:.1f} GB)")
         print()
         
         # Start recovery
         try:
             found = self.controller.start_recovery(
                 path, output, file_types, search_pattern, filter_system, 
-                progress_callback, resource_config
+                progress_callback, resource_config, message_callback=message_callback
             )
             
-            print("\n✅ Deep scan completed")
-            print(f"📄 Files recovered: {found}")
+            # The service only reports every 1000 blocks: show the final totals
+            service = self.controller.recovery_service
+            position = service.blocks * 4096
+            if total_size and total_size > 0:
+                position = min(position, total_size)
+            last_update = float('-inf')
+            progress_callback(service.blocks, position, found,
+                              resource_config.get_memory_usage_mb())
+            
+            print(f"\n{icons['ok']} Deep scan completed")
+            print(f"{icons['file']} Files recovered: {found}")
             if total_size and total_size > 0:
-                print(f"💾 Total size scanned: {total_size / (1024*1024*1024):.2f} GB")
+                print(f"{icons['disk']} Total size scanned: {total_size / (1024*1024*1024):.2f} GB")
             else:
                 mb_scanned = self.controller.recovery_service.blocks * 4096 / (1024 * 1024)
-                print(f"💾 Total size scanned: {mb_scanned:.1f} MB")
+                print(f"{icons['disk']} Total size scanned: {mb_scanned:.1f} MB")
         
         except PermissionError:
-            print("\n❌ PERMISSION DENIED")
-            print("👉 Run as ADMINISTRATOR or use WinPE / Hiren's Boot")
+            print(f"\n{icons['error']} PERMISSION DENIED")
+            print(f"{icons['hint']} Run as ADMINISTRATOR or use WinPE / Hiren's Boot")
         except Exception as e:
-            print(f"\n❌ Error during scan: {e}")
+            print(f"\n{icons['error']} Error during scan: {e}")
             if self.controller.recovery_service:
-                print(f"📄 Files recovered until error: {self.controller.recovery_service.found_count}")
+                print(f"{icons['file']} Files recovered until error: {self.controller.recovery_service.found_count}")
 
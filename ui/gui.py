@@ -13,9 +13,152 @@ from models.resource_config import ResourceConfig
 from utils.encoding_utils import detect_encoding
 from utils.file_utils import clean_filename
 import threading
+import time
 import os
+import re
+import queue
+import collections
 import base64
 import tempfile
+import itertools
+import mmap
+from concurrent.futures import ThreadPoolExecutor
+
+# Physical drive name inside a combobox entry such as "PhysicalDrive1 - Model (500.00 GB)"
+_PHYSDRIVE_RE = re.compile(r'PhysicalDrive\d+')
+
+# Progress updates from the scan thread are coalesced and shown at most this often (~30 Hz)
+PROGRESS_REFRESH_MS = 33
+
+# Log messages are queued from any thread and written to the widget in batches
+LOG_REFRESH_MS = 50
+LOG_BATCH_SIZE = 200
+# Older log lines are dropped beyond this, so long scans keep inserts cheap
+LOG_MAX_LINES = 5000
+
+# The preview tree only holds the rows in view; the mouse wheel moves this many rows
+PREVIEW_WHEEL_ROWS = 3
+
+# Generated icon, cached in the temp directory (bump the version when the drawing changes)
+ICON_CACHE_NAME = 'py_file_recovery_icon_v1.ico'
+
+# Selected files are recovered reading at most this much of each one
+RECOVER_MAX_READ = 1024 * 1024
+# Reads kept in flight while recovering selected files (where pread exists)
+RECOVER_READ_DEPTH = 32
+# Files at least this big are read with O_DIRECT (Linux), bypassing the page cache;
+# offsets and lengths are rounded out to DIRECT_READ_ALIGN
+DIRECT_READ_MIN = 256 * 1024
+DIRECT_READ_ALIGN = 4096
+
+
+def _fmt_size(size):
+    """Formats a size in bytes as KB, or as MB from 1 MB up"""
+    if size < 1048576:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1048576:.2f} MB"
+
+
+def _read_at(disk, position, size):
+    """Reads up to size bytes at position of an open file (pread where available, no seek)"""
+    if hasattr(os, 'pread'):
+        return os.pread(disk.fileno(), size, position)
+    disk.seek(position)
+    return disk.read(size)
+
+
+def _read_direct(fd, position, size):
+    """
+    Reads up to size bytes at position from a file opened with O_DIRECT
+    
+    O_DIRECT needs aligned offsets, lengths and memory: the read covers the
+    aligned extent around the request into an anonymous mmap (page aligned)
+    and the requested part is sliced out of it.
+    """
+    start = position - position % DIRECT_READ_ALIGN
+    end = -(-(position + size) // DIRECT_READ_ALIGN) * DIRECT_READ_ALIGN
+    buf = mmap.mmap(-1, end - start)
+    try:
+        read = os.preadv(fd, [buf], start)
+        return buf[position - start:min(read, position - start + size)]
+    finally:
+        buf.close()
+
+
+def _process_selected(disk, file_list, process, direct_fd=None, mapped=None):
+    """
+    Reads each file of file_list and runs process(index, file_info, data) on it
+    
+    Yields (file_info, result, error) in the order of file_list. With pread,
+    up to RECOVER_READ_DEPTH files are in progress at once on a thread pool:
+    reads and writes release the GIL, so the disk has several requests queued
+    and decoding one file overlaps the I/O of the others. Large files are read
+    through direct_fd (an O_DIRECT descriptor of the same disk) when one is
+    given, and the rest are copied out of mapped (an mmap of a disk image)
+    when there is one, which needs no system call for pages already cached.
+    
+    Each step waits for the next file's result, so this is consumed on a
+    worker thread, never in a Tk callback.
+    """
+    def run(index, file_info):
+        # For text files, read up to 1MB
+        size = min(file_info['size'], RECOVER_MAX_READ)
+        try:
+            data = None
+            if direct_fd is not None and size >= DIRECT_READ_MIN:
+                try:
+                    data = _read_direct(direct_fd, file_info['position'], size)
+                except OSError:
+                    pass  # Not supported here: use the normal read
+            if data is None and mapped is not None:
+                data = mapped[file_info['position']:file_info['position'] + size]
+            if data is None:
+                data = _read_at(disk, file_info['position'], size)
+            return process(index, file_info, data), None
+        except Exception as e:
+            return None, e
+    
+    if not hasattr(os, 'pread') or len(file_list) < 2:
+        for index, file_info in enumerate(file_list, 1):
+            yield (file_info,) + run(index, file_info)
+        return
+    
+    files = enumerate(file_list, 1)
+    with ThreadPoolExecutor(max_workers=RECOVER_READ_DEPTH) as pool:
+        pending = collections.deque((file_info, pool.submit(run, index, file_info))
+                                    for index, file_info in itertools.islice(files, RECOVER_READ_DEPTH))
+        while pending:
+            file_info, future = pending.popleft()
+            for index, next_info in itertools.islice(files, 1):
+                pending.append((next_info, pool.submit(run, index, next_info)))
+            yield (file_info,) + future.result()
+
+
+def _create_unique(output_dir, name, taken, next_suffix):
+    """
+    Creates a new file output_dir/name (or name_1, name_2, ...) and returns (fd, path)
+    
+    taken holds the names already in output_dir (listed once at the start)
+    plus the ones handed out since, and next_suffix the next suffix to try
+    per name, so repeated names are resolved in memory instead of with one
+    failed open per existing file. O_EXCL still makes the final pick atomic,
+    so threads writing to the same directory never get the same file.
+    """
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    name_base, ext = os.path.splitext(name)
+    counter = next_suffix.get(name, 0)
+    while True:
+        candidate = name if counter == 0 else f"{name_base}_{counter}{ext}"
+        counter += 1
+        if candidate in taken:
+            continue
+        taken.add(candidate)
+        next_suffix[name] = counter
+        path = os.path.join(output_dir, candidate)
+        try:
+            return os.open(path, flags, 0o644), path
+        except FileExistsError:
+            continue
 
 
 class GUI:
@@ -36,6 +179,28 @@ class GUI:
         self.is_scanning = False
         self.total_size = 0
         self.physical_drives_info = None  # Store physical drive info
+        self._physical_display_to_info = {}  # Combobox text -> physical drive info
+        # Latest progress snapshot from the scan thread, shown by _flush_progress
+        self._progress_lock = threading.Lock()
+        self._pending_progress = None
+        self._progress_template = ""
+        self._progress_is_determinate = False
+        # Last texts shown by _flush_progress, to skip setting a variable to the same text
+        self._last_progress_str = None
+        self._last_percent_str = None
+        # Pending log messages (deque appends are thread-safe), drained by _drain_log
+        self._log_queue = collections.deque()
+        # UI work requested by other threads, run in the UI thread by _drain_ui_queue
+        self._ui_queue = queue.Queue()
+        # Worker thread recovering files selected in the preview (it owns the read pool)
+        self._selected_recovery_thread = None
+        # Resource configs and total RAM are computed once, not on every mode click
+        self._resource_configs = {
+            'performance': ResourceConfig.create_performance_mode(),
+            'balanced': ResourceConfig.create_balanced_mode(),
+            'low': ResourceConfig.create_low_resource_mode(),
+        }
+        self._total_mem_mb = ResourceConfig.get_available_memory_mb()
         self.setup_ui()
     
     def setup_ui(self):
@@ -149,25 +314,43 @@ class GUI:
         
         # Log tab
         log_frame = ttk.Frame(self.results_notebook)
-        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=70)
+        # Append-only log: no undo history, and no line wrapping to recompute on insert
+        self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=70, undo=False,
+                                                  autoseparators=False, maxundo=0, wrap='none')
         self.log_text.pack(fill=tk.BOTH, expand=True)
         self.results_notebook.add(log_frame, text="Log")
         
         # Preview tab (will be populated when in preview mode)
         self.preview_frame = ttk.Frame(self.results_notebook)
         self.preview_tree = None  # Will be created when needed
-        self.preview_file_data = {}  # Store file data by item ID for recovery
+        self.preview_file_data = {}  # File data of the rows currently in the tree, by item ID
+        self._preview_all = []  # Every file found; only a window of it is in the tree
+        self._preview_checked = set()  # Indexes in _preview_all selected for recovery
+        self._preview_top = 0  # Index of the first row shown
+        self._preview_rows = 20  # Rows that fit in the tree
+        self._preview_streamed = 0  # Rows of the live list already accounted for
+        self._preview_rendered = None  # List whose rows are in the tree
         self.results_notebook.add(self.preview_frame, text="Preview")
+        # Preview clicks are only handled while the Preview tab is shown
+        self.results_notebook.bind('<<NotebookTabChanged>>', self._on_results_tab_changed)
         
         main_frame.rowconfigure(12, weight=1)
         
         # Initialize
         self.refresh_drives()
         self.log("GUI initialized. Ready to start recovery.")
+        self.root.after(LOG_REFRESH_MS, self._drain_log)
+        self.root.after(PROGRESS_REFRESH_MS, self._drain_ui_queue)
     
     def _set_icon(self):
         """Sets the application icon"""
         try:
+            # Reuse the icon generated on a previous launch: no PIL import or drawing
+            icon_path = os.path.join(tempfile.gettempdir(), ICON_CACHE_NAME)
+            if os.path.exists(icon_path):
+                self.root.iconbitmap(icon_path)
+                return
+            
             # Try to create a simple icon using PIL if available
             try:
                 from PIL import Image, ImageDraw
@@ -202,10 +385,11 @@ class GUI:
                 # Circular part of arrow
                 draw.arc([28, 28, 44, 44], start=0, end=180, fill=(50, 205, 50), width=3)
                 
-                # Save to temporary file
-                icon_path = os.path.join(tempfile.gettempdir(), 'recovery_icon.ico')
-                # Save as ICO (PIL will handle multiple sizes automatically)
-                img.save(icon_path, format='ICO')
+                # Save as ICO (PIL will handle multiple sizes automatically), then
+                # move it into place so a later launch never reads a partial file
+                tmp_path = f"{icon_path}.{os.getpid()}.tmp"
+                img.save(tmp_path, format='ICO')
+                os.replace(tmp_path, icon_path)
                 self.root.iconbitmap(icon_path)
                 
             except ImportError:
@@ -234,17 +418,18 @@ class GUI:
         else:
             # Get physical drives with names
             drives_info = self.controller.list_physical_drives_with_names()
+            self._physical_display_to_info = {}
             if drives_info:
                 # Store drive info for later use
                 self.physical_drives_info = drives_info
-                # Create display list with names
+                # Create display list with names, remembering which drive each one is
                 drives = []
                 for drive in drives_info:
-                    model = drive.get('model', 'Unknown')
-                    size_gb = ""
-                    if 'size' in drive and drive['size']:
-                        size_gb = f" ({drive['size'] / (1024**3):.2f} GB)"
-                    drives.append(f"{drive['display_name']}{size_gb}")
+                    size_gb = f" ({drive['size'] / (1024**3):.2f} GB)" if drive.get('size') else ""
+                    display_name = f"{drive['display_name']}{size_gb}"
+                    drive['_canonical_path'] = rf"\\.\{drive['name']}"
+                    self._physical_display_to_info[display_name] = drive
+                    drives.append(display_name)
             else:
                 # Fallback to simple list
                 drives = self.controller.list_physical_drives()
@@ -264,17 +449,12 @@ class GUI:
         """Updates the memory info label based on selected resource mode"""
         try:
             mode = self.resource_mode_var.get()
-            if mode == "performance":
-                config = ResourceConfig.create_performance_mode()
-            elif mode == "low":
-                config = ResourceConfig.create_low_resource_mode()
-            else:  # balanced
-                config = ResourceConfig.create_balanced_mode()
+            config = self._resource_configs.get(mode, self._resource_configs['balanced'])
             
             if config.max_memory_mb:
                 mem_gb = config.max_memory_mb / 1024
-                total_mem_gb = ResourceConfig.get_available_memory_mb() / 1024
-                percentage = (config.max_memory_mb / ResourceConfig.get_available_memory_mb()) * 100
+                total_mem_gb = self._total_mem_mb / 1024
+                percentage = (config.max_memory_mb / self._total_mem_mb) * 100
                 self.memory_info_var.set(f"→ Will use: {mem_gb:.1f} GB ({percentage:.0f}% of {total_mem_gb:.1f} GB RAM)")
             else:
                 self.memory_info_var.set("→ No memory limit")
@@ -282,10 +462,29 @@ class GUI:
             self.memory_info_var.set("→ Error calculating memory")
     
     def log(self, message):
-        """Adds a message to the log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        """Adds a message to the log (safe to call from any thread)"""
+        self._log_queue.append(message)
+    
+    def _drain_log(self):
+        """Writes queued log messages in one insert (runs periodically in the UI thread)"""
+        queue = self._log_queue
+        if queue:
+            messages = []
+            for _ in range(min(len(queue), LOG_BATCH_SIZE)):
+                messages.append(queue.popleft())
+            
+            # Only follow the end of the log if the user has not scrolled up to read it
+            follow = self.log_text.yview()[1] >= 0.999
+            self.log_text.insert(tk.END, "\n".join(messages) + "\n")
+            
+            # Trim the oldest lines in a single delete once over the cap
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            excess = line_count - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            if follow:
+                self.log_text.yview_moveto(1.0)
+        self.root.after(LOG_REFRESH_MS, self._drain_log)
     
     def start_recovery(self):
         """Starts the recovery process"""
@@ -311,9 +510,9 @@ class GUI:
         file_types = None
         types_input = self.file_types_var.get().strip()
         if types_input:
-            file_types = [t.strip().lower() for t in types_input.split(',') if t.strip()]
-            valid_types = FileSignatures.get_all_types()
-            file_types = [t for t in file_types if t in valid_types]
+            valid_types = FileSignatures.ALL_TYPES
+            file_types = [t for t in (s.strip().lower() for s in types_input.split(','))
+                          if t in valid_types]
             if not file_types:
                 file_types = None
         
@@ -325,46 +524,18 @@ class GUI:
         if drive_type == "logical":
             disk_path = rf"\\.\{drive.replace(':', '')}:"
         else:
-            # For physical drives, extract the actual drive name from display string
-            if self.physical_drives_info:
-                # Find the matching drive info
-                selected_drive = None
-                for drive_info in self.physical_drives_info:
-                    size_gb = ""
-                    if 'size' in drive_info and drive_info['size']:
-                        size_gb = f" ({drive_info['size'] / (1024**3):.2f} GB)"
-                    display_name = f"{drive_info['display_name']}{size_gb}"
-                    if display_name == drive:
-                        selected_drive = drive_info
-                        break
-                
-                if selected_drive:
-                    disk_path = rf"\\.\{selected_drive['name']}"
-                else:
-                    # Fallback: try to extract PhysicalDrive from display name
-                    if "PhysicalDrive" in drive:
-                        parts = drive.split(" - ")
-                        if parts:
-                            disk_path = rf"\\.\{parts[0]}"
-                    else:
-                        disk_path = rf"\\.\{drive}"
+            # For physical drives, use the path stored with the selected entry
+            selected_drive = self._physical_display_to_info.get(drive)
+            if selected_drive:
+                disk_path = selected_drive['_canonical_path']
             else:
-                # Fallback to simple path
-                if "PhysicalDrive" in drive:
-                    parts = drive.split(" - ")
-                    if parts:
-                        disk_path = rf"\\.\{parts[0]}"
-                else:
-                    disk_path = rf"\\.\{drive}"
+                # Fallback: extract PhysicalDriveN from the entry text
+                match = _PHYSDRIVE_RE.search(drive)
+                disk_path = rf"\\.\{match.group() if match else drive}"
         
         # Get resource config
         resource_mode = self.resource_mode_var.get()
-        if resource_mode == "performance":
-            resource_config = ResourceConfig.create_performance_mode()
-        elif resource_mode == "low":
-            resource_config = ResourceConfig.create_low_resource_mode()
-        else:
-            resource_config = ResourceConfig.create_balanced_mode()
+        resource_config = self._resource_configs.get(resource_mode, self._resource_configs['balanced'])
         
         # Store disk path for later recovery
         self.last_disk_path = disk_path
@@ -388,37 +559,48 @@ class GUI:
         else:
             self.start_button.config(text="Recovering...", state=tk.DISABLED)
         
-        # Initialize progress bar
-        if self.total_size and self.total_size > 0:
+        # Initialize progress bar and the progress text template, whose total
+        # size part stays the same for the whole scan
+        self._progress_is_determinate = bool(self.total_size and self.total_size > 0)
+        if self._progress_is_determinate:
             self.progress_bar.config(mode='determinate', maximum=100)
             self.progress_bar['value'] = 0
+            mb_total = self.total_size >> 20
+            self._progress_template = f"Blocks: {{:,}} | Scanned: {{:,}} MB / {mb_total:,} MB | Found: {{}}{{}}"
         else:
+            self._progress_template = "Blocks: {:,} | Scanned: {:,} MB | Found: {}{}"
             self.progress_bar.config(mode='indeterminate')
             self.progress_bar.start()
         self.progress_percent_var.set("0%")
         
+        # Progress is shown from the UI thread at a fixed rate instead of per callback
+        self._pending_progress = None
+        self._last_progress_str = None
+        self._last_percent_str = "0%"
+        filter_system = self.filter_system_var.get()
+        
+        # The scan thread never touches Tk: UI work goes through _call_in_ui
+        call_in_ui = self._call_in_ui
+        
         def recovery_thread():
             try:
+                last_reported = 0.0
+                min_interval = PROGRESS_REFRESH_MS / 1000
+                
                 def progress_callback(blocks, position, found, memory_usage=None):
-                    mb_scanned = position / (1024 * 1024)
-                    mem_info = f" | Memory: {memory_usage:.1f} MB" if memory_usage else ""
-                    
-                    # Calculate percentage
-                    if self.total_size and self.total_size > 0:
-                        percentage = (position / self.total_size) * 100
-                        mb_total = self.total_size / (1024 * 1024)
-                        self.progress_var.set(f"Blocks: {blocks:,} | Scanned: {mb_scanned:.1f} MB / {mb_total:.1f} MB | Found: {found}{mem_info}")
-                        self.progress_bar['value'] = percentage
-                        self.progress_percent_var.set(f"{percentage:.2f}%")
-                    else:
-                        self.progress_var.set(f"Blocks: {blocks:,} | Scanned: {mb_scanned:.1f} MB | Found: {found}{mem_info}")
-                        # Use indeterminate mode if size unknown
-                        if self.progress_bar['mode'] != 'indeterminate':
-                            self.progress_bar.config(mode='indeterminate')
-                            self.progress_bar.start()
-                        self.progress_percent_var.set("Calculating...")
+                    # Skip updates the UI could not show anyway, so a slow UI never slows the scan
+                    nonlocal last_reported
+                    now = time.monotonic()
+                    if now - last_reported < min_interval:
+                        return
+                    last_reported = now
                     
-                    self.log(f"Progress: {blocks:,} blocks scanned, {found} files found{mem_info}")
+                    # Only record the latest values; the UI thread shows them periodically.
+                    # In preview mode the snapshot also carries the live list of found
+                    # files, so rows appear while the scan goes on
+                    preview_list = self.controller.get_preview_list() if preview_mode else None
+                    with self._progress_lock:
+                        self._pending_progress = (blocks, position, found, memory_usage, preview_list)
                 
                 self.log(f"Starting recovery from {disk_path}")
                 self.log(f"Output directory: {output}")
@@ -429,19 +611,19 @@ class GUI:
                 self.log(f"Resource mode: {resource_mode}")
                 if resource_config.max_memory_mb:
                     mem_gb = resource_config.max_memory_mb / 1024
-                    percentage = (resource_config.max_memory_mb / ResourceConfig.get_available_memory_mb()) * 100
+                    percentage = (resource_config.max_memory_mb / self._total_mem_mb) * 100
                     self.log(f"Memory limit: {resource_config.max_memory_mb} MB ({mem_gb:.1f} GB - {percentage:.0f}% of system RAM)")
                 
                 self.log(f"Operation mode: {'Preview (List Only)' if preview_mode else 'Recover Files'}")
                 
                 found = self.controller.start_recovery(
                     disk_path, output, file_types, search_pattern,
-                    self.filter_system_var.get(), progress_callback, resource_config, preview_mode
+                    filter_system, progress_callback, resource_config, preview_mode
                 )
                 
                 # If preview mode, show results
                 if preview_mode:
-                    self._display_preview_results()
+                    call_in_ui(self._display_preview_results)
                 
                 if self.controller.recovery_service and self.controller.recovery_service.cancelled:
                     # Get preview list to show found files
@@ -452,37 +634,37 @@ class GUI:
                         self.log(f"📄 Files found before cancellation: {found}")
                         # Display preview results if any files were found
                         if found > 0 and preview_list:
-                            self._display_preview_results()
-                            self.results_notebook.select(1)  # Switch to preview tab
-                            messagebox.showinfo("Cancelled", 
+                            call_in_ui(self._display_preview_results)
+                            call_in_ui(self.results_notebook.select, 1)  # Switch to preview tab
+                            call_in_ui(messagebox.showinfo, "Cancelled", 
                                               f"Preview was cancelled.\n{found} files found before cancellation.\n\n"
                                               f"Check the Preview tab to see the list of files.")
                         else:
-                            messagebox.showinfo("Cancelled", f"Preview was cancelled.\n{found} files found before cancellation.")
+                            call_in_ui(messagebox.showinfo, "Cancelled", f"Preview was cancelled.\n{found} files found before cancellation.")
                     else:
                         self.log(f"\n⚠️ Recovery cancelled by user")
                         self.log(f"📄 Files found before cancellation: {found}")
                         # Show found files even in recover mode
                         if found > 0 and preview_list:
-                            self._setup_preview_tree()  # Ensure preview tree is set up
-                            self._display_preview_results()
-                            self.results_notebook.select(1)  # Switch to preview tab
-                            messagebox.showinfo("Cancelled", 
+                            call_in_ui(self._setup_preview_tree)  # Ensure preview tree is set up
+                            call_in_ui(self._display_preview_results)
+                            call_in_ui(self.results_notebook.select, 1)  # Switch to preview tab
+                            call_in_ui(messagebox.showinfo, "Cancelled", 
                                               f"Recovery was cancelled.\n{found} files found before cancellation.\n\n"
                                               f"Check the Preview tab to see the list of files.\n"
                                               f"You can switch to Preview mode to recover them.")
                         else:
-                            messagebox.showinfo("Cancelled", f"Recovery was cancelled.\n{found} files found before cancellation.")
+                            call_in_ui(messagebox.showinfo, "Cancelled", f"Recovery was cancelled.\n{found} files found before cancellation.")
                 else:
                     if preview_mode:
                         self.log(f"\n✅ Preview completed!")
                         self.log(f"📄 Files found: {found}")
-                        messagebox.showinfo("Preview Complete", f"Preview completed!\n{found} files found.\nCheck the Preview tab to see the list.")
-                        self.results_notebook.select(1)  # Switch to preview tab
+                        call_in_ui(messagebox.showinfo, "Preview Complete", f"Preview completed!\n{found} files found.\nCheck the Preview tab to see the list.")
+                        call_in_ui(self.results_notebook.select, 1)  # Switch to preview tab
                     else:
                         self.log(f"\n✅ Recovery completed!")
                         self.log(f"📄 Files recovered: {found}")
-                        messagebox.showinfo("Success", f"Recovery completed!\n{found} files recovered.")
+                        call_in_ui(messagebox.showinfo, "Success", f"Recovery completed!\n{found} files recovered.")
                 
             except Exception as e:
                 if "cancelled" in str(e).lower() or (self.controller.recovery_service and self.controller.recovery_service.cancelled):
@@ -492,22 +674,23 @@ class GUI:
                         preview_list = self.controller.get_preview_list()
                         if preview_list:
                             self.log(f"📋 Showing {len(preview_list)} files found...")
-                            self._display_preview_results()
-                            self.results_notebook.select(1)  # Switch to preview tab
-                            messagebox.showinfo("Cancelled", 
+                            call_in_ui(self._display_preview_results)
+                            call_in_ui(self.results_notebook.select, 1)  # Switch to preview tab
+                            call_in_ui(messagebox.showinfo, "Cancelled", 
                                               f"Recovery was cancelled.\n{len(preview_list)} files found.\n\n"
                                               f"Check the Preview tab to see the list of files.")
                         else:
-                            messagebox.showinfo("Cancelled", "Recovery was cancelled.")
+                            call_in_ui(messagebox.showinfo, "Cancelled", "Recovery was cancelled.")
                     else:
-                        messagebox.showinfo("Cancelled", "Recovery was cancelled.")
+                        call_in_ui(messagebox.showinfo, "Cancelled", "Recovery was cancelled.")
                 else:
                     self.log(f"\n❌ Error: {e}")
-                    messagebox.showerror("Error", f"Recovery failed:\n{e}")
+                    call_in_ui(messagebox.showerror, "Error", f"Recovery failed:\n{e}")
             finally:
                 # Stop progressbar immediately in main thread
                 def cleanup_ui():
                     self.is_scanning = False
+                    self._pending_progress = None
                     self.start_button.config(state=tk.NORMAL, text="Start")
                     self.stop_button.config(state=tk.DISABLED)
                     try:
@@ -520,13 +703,94 @@ class GUI:
                     self.progress_percent_var.set("0%")
                 
                 # Execute in main thread
-                self.root.after(0, cleanup_ui)
+                call_in_ui(cleanup_ui)
         
         self.recovery_thread = threading.Thread(target=recovery_thread, daemon=True)
         self.recovery_thread.start()
     
+    def _call_in_ui(self, func, *args):
+        """Queues func(*args) to run in the UI thread (safe to call from any thread)"""
+        self._ui_queue.put((func, args))
+    
+    def _drain_ui_queue(self):
+        """Runs the UI work queued by other threads and refreshes progress (periodic)"""
+        # Schedule the next run first: a queued dialog runs a nested event loop,
+        # and this keeps exactly one pending run either way
+        self.root.after(PROGRESS_REFRESH_MS, self._drain_ui_queue)
+        
+        while True:
+            try:
+                func, args = self._ui_queue.get_nowait()
+            except queue.Empty:
+                break
+            func(*args)
+        
+        self._flush_progress()
+    
+    def _flush_progress(self):
+        """Shows the latest progress snapshot (called from _drain_ui_queue)"""
+        with self._progress_lock:
+            snapshot = self._pending_progress
+            self._pending_progress = None
+        
+        if snapshot is not None:
+            blocks, position, found, memory_usage, preview_list = snapshot
+            # Whole MB and hundredths of a percent are all the labels show, so stay in integers
+            mb_scanned = position >> 20
+            mem_info = f" | Memory: {memory_usage:.1f} MB" if memory_usage else ""
+            progress_str = self._progress_template.format(blocks, mb_scanned, found, mem_info)
+            if progress_str != self._last_progress_str:
+                self._last_progress_str = progress_str
+                self.progress_var.set(progress_str)
+            
+            # Calculate percentage (the bar mode was already set when the scan started)
+            if self._progress_is_determinate:
+                hundredths = position * 10000 // self.total_size
+                percent_str = f"{hundredths // 100}.{hundredths % 100:02d}%"
+            else:
+                percent_str = "Calculating..."
+            # On slow disks the percentage often has not changed since the last tick
+            if percent_str != self._last_percent_str:
+                self._last_percent_str = percent_str
+                self.progress_percent_var.set(percent_str)
+                if self._progress_is_determinate:
+                    self.progress_bar['value'] = hundredths / 100
+            
+            self.log(f"Progress: {blocks:,} blocks scanned, {found} files found{mem_info}")
+            
+            if preview_list is not None and self.preview_tree is not None:
+                self._stream_preview_rows(preview_list)
+    
+    def _stream_preview_rows(self, preview_list):
+        """Shows the files found so far while a preview scan is running"""
+        total = len(preview_list)
+        if preview_list is self._preview_all and total == self._preview_streamed:
+            return
+        self._preview_all = preview_list
+        self._preview_streamed = total
+        
+        # Only the rows in view are inserted: once the window is full, new
+        # files just make the scrollbar thumb smaller
+        if len(self.preview_file_data) < self._preview_rows:
+            self._render_preview_window()
+        else:
+            bottom = self._preview_top + self._preview_rows
+            self.preview_v_scrollbar.set(self._preview_top / total, bottom / total)
+        self._update_preview_status()
+    
     def _setup_preview_tree(self):
         """Sets up the preview tree view with selection checkboxes"""
+        # Reuse the existing tree: emptying it is much cheaper than rebuilding the widgets
+        if self.preview_tree is not None and self.preview_tree.winfo_exists():
+            self.preview_tree.delete(*self.preview_tree.get_children())
+            self.preview_file_data = {}
+            self._preview_all = []
+            self._preview_checked = set()
+            self._preview_top = 0
+            self._preview_streamed = 0
+            self._update_preview_status()
+            return
+        
         # Clear existing tree if any
         for widget in self.preview_frame.winfo_children():
             widget.destroy()
@@ -560,11 +824,13 @@ class GUI:
         
         # Treeview with checkbox column
         self.preview_tree = ttk.Treeview(tree_frame, columns=('Select', 'Type', 'Size', 'Original Name', 'Position'), 
-                                        show='tree headings', yscrollcommand=v_scrollbar.set,
-                                        xscrollcommand=h_scrollbar.set)
+                                        show='tree headings', xscrollcommand=h_scrollbar.set)
         
-        v_scrollbar.config(command=self.preview_tree.yview)
+        # Only the visible rows are inserted, so the vertical scrollbar moves
+        # that window over the whole list instead of scrolling the tree
+        v_scrollbar.config(command=self._on_preview_scroll)
         h_scrollbar.config(command=self.preview_tree.xview)
+        self.preview_v_scrollbar = v_scrollbar
         
         # Configure columns
         self.preview_tree.heading('#0', text='#')
@@ -581,8 +847,14 @@ class GUI:
         self.preview_tree.column('Original Name', width=250, minwidth=150)
         self.preview_tree.column('Position', width=150, minwidth=100)
         
-        # Bind click event to toggle selection
-        self.preview_tree.bind('<Button-1>', self._on_preview_click)
+        # Bind click event to toggle selection (while the Preview tab is shown)
+        self._on_results_tab_changed()
+        
+        # Resizing changes how many rows fit; the wheel moves the window
+        self.preview_tree.bind('<Configure>', self._on_preview_resize)
+        self.preview_tree.bind('<MouseWheel>', self._on_preview_wheel)
+        self.preview_tree.bind('<Button-4>', self._on_preview_wheel)
+        self.preview_tree.bind('<Button-5>', self._on_preview_wheel)
         
         # Pack
         self.preview_tree.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
@@ -594,44 +866,135 @@ class GUI:
         
         # Clear file data
         self.preview_file_data = {}
+        self._preview_all = []
+        self._preview_checked = set()
+        self._preview_top = 0
+        self._preview_streamed = 0
     
     def _display_preview_results(self):
         """Displays preview results in the tree view"""
         if not self.preview_tree:
             self._setup_preview_tree()
         
-        # Clear existing items
-        for item in self.preview_tree.get_children():
-            self.preview_tree.delete(item)
-        
-        # Clear file data
-        self.preview_file_data = {}
-        
-        # Get preview list
+        # Keep the whole list in Python; the tree only shows the rows in view.
+        # If the rows were already streamed during the scan, keep the user's
+        # selection and scroll position
         preview_list = self.controller.get_preview_list()
-        
-        # Populate tree
-        for idx, file_info in enumerate(preview_list, 1):
-            size_kb = file_info['size'] / 1024
-            size_str = f"{size_kb:.1f} KB" if size_kb < 1024 else f"{size_kb/1024:.2f} MB"
-            
-            item_id = self.preview_tree.insert('', tk.END, text=str(idx),
-                                    values=(
-                                        '☐',  # Unchecked checkbox
-                                        file_info['type'].upper(),
-                                        size_str,
-                                        file_info['original_name'] or file_info['filename'],
-                                        f"{file_info['position']:,}"
-                                    ))
-            
-            # Store file data for recovery
-            self.preview_file_data[item_id] = file_info
+        if preview_list is not self._preview_all:
+            self._preview_all = preview_list
+            self._preview_checked = set()
+            self._preview_top = 0
+        self._preview_streamed = len(preview_list)
+        self._render_preview_window()
         
         # Update status
         self._update_preview_status()
         
         self.log(f"Preview: {len(preview_list)} files listed in Preview tab")
     
+    def _render_preview_window(self):
+        """Fills the tree with the rows of the preview list that fit in view"""
+        tree = self.preview_tree
+        shown = self.preview_file_data
+        all_files = self._preview_all
+        total = len(all_files)
+        top = self._preview_top
+        bottom = min(total, top + self._preview_rows)
+        
+        # Rows still in view are kept: scrolling only deletes the rows that left
+        # the window and inserts the ones that entered it. Rows of another list
+        # (a new scan) are all replaced
+        if self._preview_rendered is not all_files:
+            tree.delete(*tree.get_children())
+            shown.clear()
+            self._preview_rendered = all_files
+        left = [item for item in shown if not top <= int(item) < bottom]
+        if left:
+            tree.delete(*left)
+            for item in left:
+                del shown[item]
+        
+        if shown:
+            kept = [int(item) for item in shown]
+            kept_top, kept_bottom = min(kept), max(kept) + 1
+        else:
+            kept_top = kept_bottom = bottom
+        
+        if top < kept_top or kept_bottom < bottom:
+            # Hide the data columns while filling, so Tk lays out the rows once at the end
+            tree.configure(displaycolumns=())
+            for position, idx in enumerate(range(top, kept_top)):
+                self._insert_preview_row(position, idx, all_files[idx])
+            for idx in range(kept_bottom, bottom):
+                self._insert_preview_row(tk.END, idx, all_files[idx])
+            tree.configure(displaycolumns='#all')
+        
+        tree.yview_moveto(0)
+        if total:
+            self.preview_v_scrollbar.set(top / total, bottom / total)
+        else:
+            self.preview_v_scrollbar.set(0.0, 1.0)
+    
+    def _insert_preview_row(self, position, idx, file_info):
+        """Inserts the row of file idx of the preview list at position in the tree"""
+        # The item ID is the index in the whole list, so selections survive scrolling
+        item_id = self.preview_tree.insert('', position, iid=str(idx), text=str(idx + 1),
+                                           values=(
+                                               '☑' if idx in self._preview_checked else '☐',
+                                               file_info['type'].upper(),
+                                               _fmt_size(file_info['size']),
+                                               file_info['original_name'] or file_info['filename'],
+                                               f"{file_info['position']:,}"
+                                           ))
+        
+        # Store file data for recovery
+        self.preview_file_data[item_id] = file_info
+    
+    def _scroll_preview_to(self, top):
+        """Moves the preview window so that row top is the first one shown"""
+        top = max(0, min(top, len(self._preview_all) - self._preview_rows))
+        if top != self._preview_top:
+            self._preview_top = top
+            self._render_preview_window()
+    
+    def _on_preview_scroll(self, action, *args):
+        """Handles the vertical scrollbar of the preview tree"""
+        if action == 'moveto':
+            self._scroll_preview_to(int(float(args[0]) * len(self._preview_all)))
+        elif action == 'scroll':
+            step = self._preview_rows if args[1] == 'pages' else 1
+            self._scroll_preview_to(self._preview_top + int(args[0]) * step)
+    
+    def _on_preview_wheel(self, event):
+        """Scrolls the preview window with the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self._scroll_preview_to(self._preview_top - PREVIEW_WHEEL_ROWS)
+        else:
+            self._scroll_preview_to(self._preview_top + PREVIEW_WHEEL_ROWS)
+        return "break"
+    
+    def _on_preview_resize(self, event):
+        """Recomputes how many rows fit in the preview tree"""
+        try:
+            row_height = int(ttk.Style(self.root).lookup('Treeview', 'rowheight'))
+        except (TypeError, ValueError):
+            row_height = 20
+        # Leave room for the heading row
+        rows = max(1, (event.height - row_height - 4) // row_height)
+        if rows != self._preview_rows:
+            self._preview_rows = rows
+            self._preview_top = max(0, min(self._preview_top, len(self._preview_all) - rows))
+            self._render_preview_window()
+    
+    def _on_results_tab_changed(self, event=None):
+        """Binds the preview click handler only while the Preview tab is selected"""
+        if self.preview_tree is None:
+            return
+        if self.results_notebook.index('current') == 1:
+            self.preview_tree.bind('<Button-1>', self._on_preview_click)
+        else:
+            self.preview_tree.unbind('<Button-1>')
+    
     def _on_preview_click(self, event):
         """Handles click on preview tree to toggle selection"""
         region = self.preview_tree.identify_region(event.x, event.y)
@@ -641,54 +1004,61 @@ class GUI:
             
             # If clicked on Select column (column #1)
             if column == '#1' and item:
-                current_values = list(self.preview_tree.item(item, 'values'))
-                if current_values[0] == '☐':
-                    current_values[0] = '☑'
+                # The selection lives in _preview_checked; Tk only gets the new glyph
+                idx = int(item)
+                if idx in self._preview_checked:
+                    self._preview_checked.discard(idx)
+                    self.preview_tree.set(item, 'Select', '☐')
                 else:
-                    current_values[0] = '☐'
-                self.preview_tree.item(item, values=tuple(current_values))
+                    self._preview_checked.add(idx)
+                    self.preview_tree.set(item, 'Select', '☑')
                 self._update_preview_status()
     
     def _select_all_preview(self):
         """Selects all files in preview"""
-        for item in self.preview_tree.get_children():
-            values = list(self.preview_tree.item(item, 'values'))
-            values[0] = '☑'
-            self.preview_tree.item(item, values=tuple(values))
+        checked = self._preview_checked
+        self._set_preview_glyphs([item for item in self.preview_file_data if int(item) not in checked], '☑')
+        self._preview_checked = set(range(len(self._preview_all)))
         self._update_preview_status()
     
     def _deselect_all_preview(self):
         """Deselects all files in preview"""
-        for item in self.preview_tree.get_children():
-            values = list(self.preview_tree.item(item, 'values'))
-            values[0] = '☐'
-            self.preview_tree.item(item, values=tuple(values))
+        checked = self._preview_checked
+        self._set_preview_glyphs([item for item in self.preview_file_data if int(item) in checked], '☐')
+        self._preview_checked = set()
         self._update_preview_status()
     
+    def _set_preview_glyphs(self, items, glyph):
+        """Sets the Select column of the given rows, laying out the tree once at the end"""
+        if not items:
+            return
+        tree = self.preview_tree
+        tree.configure(displaycolumns=())
+        for item in items:
+            tree.set(item, 'Select', glyph)
+        tree.configure(displaycolumns='#all')
+    
     def _update_preview_status(self):
         """Updates the preview status label"""
-        selected = 0
-        total = 0
-        for item in self.preview_tree.get_children():
-            total += 1
-            values = self.preview_tree.item(item, 'values')
-            if values and values[0] == '☑':
-                selected += 1
+        selected = len(self._preview_checked)
+        total = len(self._preview_all)
         self.preview_status_var.set(f"{selected} of {total} files selected")
     
     def _recover_selected_files(self):
         """Recovers only the selected files from preview"""
-        # Get selected files
-        selected_files = []
-        for item in self.preview_tree.get_children():
-            values = self.preview_tree.item(item, 'values')
-            if values and values[0] == '☑' and item in self.preview_file_data:
-                selected_files.append(self.preview_file_data[item])
+        # Get selected files (in list order, also those scrolled out of view)
+        all_files = self._preview_all
+        selected_files = [all_files[idx] for idx in sorted(self._preview_checked)]
         
         if not selected_files:
             messagebox.showwarning("Warning", "Please select at least one file to recover.")
             return
         
+        # One pool of reads at a time: a second click waits for the first recovery
+        if self._selected_recovery_thread and self._selected_recovery_thread.is_alive():
+            messagebox.showwarning("Warning", "A recovery of selected files is already running.")
+            return
+        
         # Ask for output directory
         output_dir = filedialog.askdirectory(title="Select directory to save recovered files")
         if not output_dir:
@@ -698,11 +1068,19 @@ class GUI:
         if not messagebox.askyesno("Confirm", f"Recover {len(selected_files)} selected file(s)?"):
             return
         
-        # Recover selected files
-        self._recover_files_from_list(selected_files, output_dir)
+        # Recover selected files on a worker thread, so the window stays
+        # responsive and the per-file log lines show up as they happen
+        self._selected_recovery_thread = threading.Thread(
+            target=self._recover_files_from_list, args=(selected_files, output_dir), daemon=True
+        )
+        self._selected_recovery_thread.start()
     
     def _recover_files_from_list(self, file_list, output_dir):
-        """Recovers files from a list of file info"""
+        """
+        Recovers files from a list of file info
+        
+        Runs on a worker thread: it only logs, and dialogs go through _call_in_ui.
+        """
         recovered = 0
         errors = 0
         
@@ -711,75 +1089,115 @@ class GUI:
         
         # Get the original disk path
         if not hasattr(self, 'last_disk_path'):
-            messagebox.showerror("Error", "Cannot determine source disk. Please start a scan first.")
+            self._call_in_ui(messagebox.showerror, "Error", "Cannot determine source disk. Please start a scan first.")
             return
         
         disk_path = self.last_disk_path
         
+        # Read in disk order, so the disk sees one forward pass instead of random seeks
+        file_list = sorted(file_list, key=lambda file_info: file_info['position'])
+        
         try:
             with open(disk_path, "rb") as disk:
-                for idx, file_info in enumerate(file_list, 1):
+                # Tell the OS the reads go forward, so it reads ahead more aggressively
+                if hasattr(os, 'posix_fadvise'):
                     try:
-                        # Seek to file position
-                        disk.seek(file_info['position'])
-                        
-                        # Read file data (estimate size, read up to reasonable limit)
-                        # For text files, read up to 1MB or until non-text
-                        max_read = min(file_info['size'], 1024 * 1024)
-                        data = disk.read(max_read)
-                        
-                        if not data:
-                            continue
-                        
-                        # Detect encoding and decode
-                        encoding, text = detect_encoding(data)
-                        
-                        if not text:
-                            continue
-                        
-                        # Get filename
-                        filename = file_info.get('original_name') or file_info.get('filename', 'recovered_file')
-                        clean_name = clean_filename(filename)
-                        if not clean_name:
-                            clean_name = f"recovered_{recovered:05d}.{file_info.get('type', 'txt')}"
-                        
-                        # Ensure extension
-                        if '.' not in clean_name:
-                            clean_name += f".{file_info.get('type', 'txt')}"
-                        
-                        # Save file
-                        base_path = os.path.join(output_dir, clean_name)
-                        counter = 1
-                        while os.path.exists(base_path):
-                            name_base, ext = os.path.splitext(clean_name)
-                            base_path = os.path.join(output_dir, f"{name_base}_{counter}{ext}")
-                            counter += 1
-                        
-                        with open(base_path, "w", encoding="utf-8") as f:
-                            f.write(text)
-                        
-                        recovered += 1
-                        self.log(f"  [{idx}/{len(file_list)}] ✓ Recovered: {os.path.basename(base_path)}")
-                        
-                    except Exception as e:
-                        errors += 1
-                        self.log(f"  [{idx}/{len(file_list)}] ✗ Error recovering {file_info.get('filename', 'file')}: {e}")
+                        os.posix_fadvise(disk.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                
+                # Large files skip the page cache, so recovering them does not evict everything else
+                direct_fd = None
+                if hasattr(os, 'O_DIRECT') and hasattr(os, 'preadv'):
+                    try:
+                        direct_fd = os.open(disk_path, os.O_RDONLY | os.O_DIRECT)
+                    except OSError:
+                        pass
+                
+                # Disk images (regular files) are memory-mapped; raw devices are read normally
+                mapped = None
+                if os.path.isfile(disk_path) and os.path.getsize(disk_path) > 0:
+                    try:
+                        mapped = mmap.mmap(disk.fileno(), 0, access=mmap.ACCESS_READ)
+                        if hasattr(mapped, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                            mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    except (OSError, ValueError):
+                        mapped = None
+                
+                try:
+                    # Names in use are listed once; new ones are tracked in memory
+                    taken = set(os.listdir(output_dir))
+                    next_suffix = {}
+                    
+                    def recover_one(idx, file_info, data):
+                        return self._recover_one_file(idx, file_info, data, output_dir, taken, next_suffix)
+                    
+                    results = _process_selected(disk, file_list, recover_one, direct_fd, mapped)
+                    for idx, (file_info, base_path, error) in enumerate(results, 1):
+                        if error:
+                            errors += 1
+                            self.log(f"  [{idx}/{len(file_list)}] ✗ Error recovering {file_info.get('filename', 'file')}: {error}")
+                        elif base_path:
+                            recovered += 1
+                            self.log(f"  [{idx}/{len(file_list)}] ✓ Recovered: {os.path.basename(base_path)}")
+                finally:
+                    if direct_fd is not None:
+                        os.close(direct_fd)
+                    if mapped is not None:
+                        mapped.close()
         
         except PermissionError:
-            messagebox.showerror("Error", "PERMISSION DENIED. Run as ADMINISTRATOR.")
+            self._call_in_ui(messagebox.showerror, "Error", "PERMISSION DENIED. Run as ADMINISTRATOR.")
             return
         except Exception as e:
-            messagebox.showerror("Error", f"Error accessing disk:\n{e}")
+            self._call_in_ui(messagebox.showerror, "Error", f"Error accessing disk:\n{e}")
             return
         
         # Show results
-        messagebox.showinfo("Recovery Completed", 
-                          f"Recovery completed.\n\n"
-                          f"✓ Files recovered: {recovered}\n"
-                          f"✗ Errors: {errors}\n\n"
-                          f"Location: {output_dir}")
+        self._call_in_ui(messagebox.showinfo, "Recovery Completed", 
+                         f"Recovery completed.\n\n"
+                         f"✓ Files recovered: {recovered}\n"
+                         f"✗ Errors: {errors}\n\n"
+                         f"Location: {output_dir}")
         self.log(f"\n✅ Recovery completed: {recovered} file(s) recovered, {errors} error(s)")
     
+    def _recover_one_file(self, idx, file_info, data, output_dir, taken, next_suffix):
+        """
+        Decodes and saves one selected file; returns the path written, or None if skipped
+        
+        Runs on the recovery thread pool, so it only touches its own arguments.
+        """
+        if not data:
+            return None
+        
+        # Detect encoding and decode
+        encoding, text = detect_encoding(data)
+        
+        if not text:
+            return None
+        
+        # Get filename
+        filename = file_info.get('original_name') or file_info.get('filename', 'recovered_file')
+        clean_name = clean_filename(filename)
+        if not clean_name:
+            clean_name = f"recovered_{idx:05d}.{file_info.get('type', 'txt')}"
+        
+        # Ensure extension
+        if '.' not in clean_name:
+            clean_name += f".{file_info.get('type', 'txt')}"
+        
+        # Save file as UTF-8 with plain os.write calls. Data that already
+        # decoded as UTF-8 is written as read, without encoding it again
+        payload = data if encoding == 'utf-8' else text.encode('utf-8')
+        fd, base_path = _create_unique(output_dir, clean_name, taken, next_suffix)
+        try:
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        return base_path
+    
     def stop_recovery(self):
         """Stops the recovery process"""
         if not self.is_scanning:
@@ -817,7 +1235,6 @@ class GUI:
                 # Wait for thread to finish and then show results (both preview and recover modes)
                 def check_and_show_preview():
                     # Wait for recovery thread to finish (with timeout)
-                    import time
                     max_wait = 5  # Maximum 5 seconds wait
                     waited = 0
                     while self.recovery_thread and self.recovery_thread.is_alive() and waited < max_wait:
@@ -838,7 +1255,7 @@ class GUI:
                                 self.results_notebook.select(1)  # Switch to preview tab
                                 self.log("✅ Files listed in Preview tab")
                             
-                            self.root.after(0, show_preview)
+                            self._call_in_ui(show_preview)
                 
                 # Schedule preview display in background thread (for both modes)
                 threading.Thread(target=check_and_show_preview, daemon=True).start()
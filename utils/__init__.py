@@ -2,6 +2,8 @@
 
 from .file_utils import clean_filename, extract_filename_from_content
 from .encoding_utils import detect_encoding, is_text
+from .hash_utils import HashSet64
 
-__all__ = ['clean_filename', 'extract_filename_from_content', 'detect_encoding', 'is_text']
+__all__ = ['clean_filename', 'extract_filename_from_content', 'detect_encoding', 'is_text',
+           'HashSet64']
 
@@ -1,40 +1,181 @@
 """Utilidades para detección de codificación y texto"""
 
+import codecs
 import string
 from models.config import CODIFICACIONES, MIN_TEXT_LEN
 
+try:
+    import cchardet
+    CCHARDET_AVAILABLE = True
+except ImportError:
+    CCHARDET_AVAILABLE = False
+
+# Bytes imprimibles (ASCII visible y espacios en blanco)
+IMPRIMIBLES = bytes(string.printable, "ascii")
+
+# Tabla de 256 entradas para bytes.translate: 1 para los imprimibles, 0 para el resto
+_CLASES = bytes(1 if b in IMPRIMIBLES else 0 for b in range(256))
+
+# Secuencia de al menos 50 caracteres imprimibles seguidos, sobre los datos clasificados
+_SECUENCIA_IMPRIMIBLE = b'\x01' * 50
+
+# Marcas de orden de bytes (BOM); la de UTF-32 LE va antes que la de
+# UTF-16 LE porque empieza por los mismos dos bytes
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+# Resto de CODIFICACIONES con su decodificador ya resuelto. UTF-8 se prueba
+# antes aparte, y ascii se omite: es un subconjunto de UTF-8, así que nunca
+# acepta lo que UTF-8 ha rechazado
+_DECODIFICADORES = tuple(
+    (codif, codecs.getdecoder(codif))
+    for codif in CODIFICACIONES
+    if codif not in ('utf-8', 'ascii')
+)
+
+# Nombre canónico de cada codec de CODIFICACIONES, para reconocer los que propone cchardet
+_NOMBRES_CODEC = {codecs.lookup(codif).name: codif for codif in CODIFICACIONES}
+
+# Los buffers mayores se analizan por tramos de este tamaño, parando en cuanto
+# el resultado está decidido
+_TRAMO_TEXTO = 64 * 1024
+
 
 def is_text(data, threshold=0.7):
     """Detección mejorada de texto con múltiples umbrales"""
     if not data or len(data) < 10:
         return False
     
-    imprimibles = bytes(string.printable, "ascii")
-    validos = sum(b in imprimibles for b in data)
-    ratio = validos / len(data)
+    total = len(data)
+    if total > _TRAMO_TEXTO:
+        return _is_text_por_tramos(data, threshold)
     
-    # Verificar si hay secuencias de caracteres imprimibles
-    max_secuencia = 0
-    secuencia_actual = 0
+    # Clasificar cada byte una sola vez en C; el recuento y la búsqueda
+    # de secuencias se hacen sobre el resultado
+    clases = data.translate(_CLASES)
+    ratio = clases.count(1) / total
+    if ratio >= threshold:
+        return True
+    return ratio >= 0.5 and _SECUENCIA_IMPRIMIBLE in clases
+
+
+def _is_text_por_tramos(data, threshold):
+    """
+    is_text para buffers grandes, tramo a tramo
     
-    for b in data:
-        if b in imprimibles:
-            secuencia_actual += 1
-            max_secuencia = max(max_secuencia, secuencia_actual)
-        else:
-            if secuencia_actual >= 10:
-                pass
-            secuencia_actual = 0
+    Tras cada tramo se comprueba si el resultado ya es seguro: el umbral
+    alcanzado, o imposible de alcanzar aunque el resto fuera imprimible.
+    """
+    total = len(data)
+    validos = 0
+    secuencia = False
+    cola = b''  # Final del tramo anterior, para secuencias que cruzan tramos
+    
+    for inicio in range(0, total, _TRAMO_TEXTO):
+        clases = data[inicio:inicio + _TRAMO_TEXTO].translate(_CLASES)
+        validos += clases.count(1)
+        if not secuencia:
+            secuencia = _SECUENCIA_IMPRIMIBLE in cola + clases
+            cola = clases[-49:]
+        
+        if validos / total >= threshold:
+            return True
+        if secuencia and validos / total >= 0.5:
+            return True
+        
+        # Máximo alcanzable si todo lo que queda fuera imprimible
+        maximo = (total - inicio - len(clases) + validos) / total
+        if maximo < threshold and maximo < 0.5:
+            return False
+    
+    return False
+
+
+def is_text_counted(data, validos, threshold=0.7):
+    """Igual que is_text, con el número de bytes imprimibles de data ya calculado"""
+    if not data or len(data) < 10:
+        return False
+    
+    ratio = validos / len(data)
     
     # Criterios múltiples para detectar texto
-    return (ratio >= threshold) or (max_secuencia >= 50 and ratio >= 0.5)
+    if ratio >= threshold:
+        return True
+    
+    # Verificar si hay secuencias de caracteres imprimibles (búsqueda de
+    # subcadena, mucho más rápida que una expresión regular sobre binario)
+    return ratio >= 0.5 and _SECUENCIA_IMPRIMIBLE in data.translate(_CLASES)
+
+
+def printable_counts(data, step):
+    """
+    Cuenta acumulada de bytes imprimibles por tramos de step bytes
+    
+    counts[k] es el número de imprimibles en data[:k * step], de modo que
+    cada byte se clasifica una sola vez aunque las ventanas se solapen.
+    """
+    counts = [0]
+    total = 0
+    for start in range(0, len(data), step):
+        tramo = data[start:start + step]
+        total += len(tramo) - len(tramo.translate(None, IMPRIMIBLES))
+        counts.append(total)
+    return counts
+
+
+def count_printable(counts, step, start, end):
+    """
+    Imprimibles en data[start:end] a partir de printable_counts(data, step)
+    
+    start debe ser múltiplo de step, y end también salvo que llegue
+    (o pase) del final de los datos.
+    """
+    return counts[min(-(-end // step), len(counts) - 1)] - counts[start // step]
 
 
 def detect_encoding(data):
     """Intenta detectar la codificación del texto"""
-    for codif in CODIFICACIONES:
+    # Con marca de orden de bytes la codificación es conocida
+    for bom, codif in _BOMS:
+        if data.startswith(bom):
+            try:
+                texto = data.decode(codif)
+            except UnicodeDecodeError:
+                break
+            if len(texto.strip()) >= MIN_TEXT_LEN:
+                return codif, texto
+            break
+    
+    # Caso más habitual: UTF-8 válido, una sola decodificación
+    if 'utf-8' in CODIFICACIONES:
         try:
-            texto = data.decode(codif)
+            texto = data.decode('utf-8')
+        except UnicodeDecodeError:
+            pass
+        else:
+            if len(texto.strip()) >= MIN_TEXT_LEN:
+                return 'utf-8', texto
+    
+    # Sin UTF-8, cchardet distingue por ejemplo windows-1252 de latin-1, que
+    # acepta cualquier byte y ganaría siempre en el recorrido de abajo
+    if CCHARDET_AVAILABLE:
+        codif = _guess_encoding(data)
+        if codif and codif != 'utf-8':
+            try:
+                texto = data.decode(codif)
+                if len(texto.strip()) >= MIN_TEXT_LEN:
+                    return codif, texto
+            except UnicodeDecodeError:
+                pass
+    
+    for codif, decode in _DECODIFICADORES:
+        try:
+            texto = decode(data)[0]
             # Verificar que sea texto válido
             if len(texto.strip()) >= MIN_TEXT_LEN:
                 return codif, texto
@@ -42,3 +183,14 @@ def detect_encoding(data):
             continue
     return None, None
 
+
+def _guess_encoding(data):
+    """Codificación de CODIFICACIONES que propone cchardet, si tiene suficiente confianza"""
+    guess = cchardet.detect(bytes(data))
+    nombre = guess.get('encoding')
+    if not nombre or (guess.get('confidence') or 0) < 0.5:
+        return None
+    try:
+        return _NOMBRES_CODEC.get(codecs.lookup(nombre).name)
+    except LookupError:
+        return None
@@ -5,6 +5,63 @@ import re
 from collections import Counter
 from models.config import CODIFICACIONES, MIN_TEXT_LEN
 
+# Expresiones compiladas una sola vez para clean_filename e is_valid_filename
+_ESPACIOS = re.compile(r'\s+')
+_GUIONES_MULTIPLES = re.compile(r'[-_]{2,}')
+_LETRA = re.compile(r'[a-zA-Z]')
+# Motivos de rechazo de is_valid_filename en una sola búsqueda: tres o más
+# separadores seguidos, o un mismo carácter repetido cinco veces
+_SOSPECHOSO = re.compile(r'[_\-\s]{3}|(.)\1{4}')
+
+
+class _TablaLimpieza(dict):
+    """
+    Tabla para str.translate con las reglas de clean_filename
+    
+    Las entradas ASCII especiales se cargan al crearla; el resto de
+    caracteres se decide la primera vez que aparecen y queda guardado, así
+    que cada nombre se limpia con un único translate sin ramas por carácter.
+    """
+    
+    def __missing__(self, codigo):
+        c = chr(codigo)
+        if c.isascii() or c.isalnum():
+            # ASCII imprimible, letras acentuadas y demás letras o números
+            valor = c
+        elif not c.isprintable():
+            valor = None
+        else:
+            valor = '_'
+        self[codigo] = valor
+        return valor
+
+
+# Se eliminan los caracteres de control y los inválidos en Windows (y el
+# tabulador) pasan a '_'
+_LIMPIEZA = _TablaLimpieza({codigo: None for codigo in range(32)})
+_LIMPIEZA[127] = None
+_LIMPIEZA.update({ord(c): '_' for c in '<>:"|?*\\/\t'})
+
+# Patrones para buscar nombres de archivo en el contenido, por orden de prioridad
+_PATRONES_NOMBRES = [re.compile(patron, re.IGNORECASE | re.MULTILINE) for patron in (
+    # Patrones con contexto claro (prioridad alta)
+    r'(?:filename|file name|nombre archivo|archivo|file)[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
+    r'(?:saved as|guardado como|save as|guardado|saved)[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
+    r'(?:document|documento|file|archivo)\s+name[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
+    # Nombres de archivo al inicio de línea (más probable que sea un nombre real)
+    r'^([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})',
+    # Rutas completas de Windows (solo si tienen estructura válida)
+    r'([A-Z]:\\[a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\\\s]{5,100}\.[a-zA-Z0-9]{2,5})',
+    # Nombres entre comillas o comillas simples
+    r'["\']([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})["\']',
+    # Nombres después de palabras clave comunes
+    r'(?:title|título|name|nombre)[:\s=]+["\']?([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})["\']?',
+)]
+
+# Todos los patrones terminan en un carácter de nombre (o la barra de una ruta)
+# seguido de una extensión: sin esta secuencia ninguno puede coincidir
+_POSIBLE_EXTENSION = re.compile(r'[a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s\\]\.[a-zA-Z0-9]{2}', re.IGNORECASE)
+
 
 def clean_filename(nombre):
     """Limpia un nombre de archivo eliminando caracteres inválidos"""
@@ -18,25 +75,10 @@ def clean_filename(nombre):
         except:
             return None
     
-    # Eliminar caracteres nulos y otros caracteres de control
-    nombre = ''.join(c for c in nombre if c.isprintable() or c in ' \t')
-    
-    # Eliminar caracteres inválidos para nombres de archivo en Windows
-    caracteres_invalidos = '<>:"|?*\\/\x00\r\n\t'
-    for char in caracteres_invalidos:
-        nombre = nombre.replace(char, '_')
-    
-    # Eliminar caracteres no ASCII problemáticos (excepto letras acentuadas comunes)
-    nombre_limpio = ''
-    for c in nombre:
-        if c.isascii() or c in 'áéíóúÁÉÍÓÚñÑ':
-            nombre_limpio += c
-        elif c.isalnum():
-            nombre_limpio += c
-        else:
-            nombre_limpio += '_'
-    
-    nombre = nombre_limpio
+    # Eliminar caracteres de control y no imprimibles, y reemplazar los
+    # inválidos para nombres de archivo en Windows y los no ASCII que no sean
+    # letra o número (las letras acentuadas se conservan), en una sola pasada
+    nombre = nombre.translate(_LIMPIEZA)
     
     # Eliminar espacios al inicio y final
     nombre = nombre.strip()
@@ -46,10 +88,10 @@ def clean_filename(nombre):
         nombre = nombre[:-1]
     
     # Eliminar espacios múltiples y reemplazar por un solo espacio
-    nombre = re.sub(r'\s+', ' ', nombre)
+    nombre = _ESPACIOS.sub(' ', nombre)
     
     # Eliminar guiones y guiones bajos múltiples
-    nombre = re.sub(r'[-_]{2,}', '_', nombre)
+    nombre = _GUIONES_MULTIPLES.sub('_', nombre)
     
     # Si el nombre está vacío o es muy corto, retornar None
     if len(nombre) < 1:
@@ -67,7 +109,7 @@ def clean_filename(nombre):
         return None
     
     # Verificar que tenga al menos una letra
-    if not re.search(r'[a-zA-Z]', nombre):
+    if not _LETRA.search(nombre):
         return None
     
     return nombre
@@ -75,35 +117,24 @@ def clean_filename(nombre):
 
 def extract_filename_from_content(texto, datos_raw=None):
     """Intenta extraer el nombre del archivo del contenido del texto"""
-    nombres_candidatos = []
-    
-    # Buscar en las primeras líneas del texto (donde es más probable encontrar metadatos)
-    # Aumentar el rango para capturar más nombres
-    lineas_relevantes = texto.split('\n')[:50]
-    texto_busqueda = '\n'.join(lineas_relevantes)
-    
-    # También buscar en todo el texto si es pequeño (menos de 10KB)
+    # Buscar en todo el texto si es pequeño (menos de 10KB); si no, solo en
+    # las primeras líneas (donde es más probable encontrar metadatos). split
+    # con límite evita partir el texto entero para quedarse con 50 líneas
     if len(texto) < 10000:
         texto_busqueda = texto
+    else:
+        texto_busqueda = '\n'.join(texto.split('\n', 50)[:50])
+    
+    # Una sola pasada descarta el texto sin nada parecido a una extensión,
+    # en lugar de recorrerlo con los siete patrones
+    if not _POSIBLE_EXTENSION.search(texto_busqueda):
+        return None
     
-    # Patrón 1: Nombres de archivos con contexto específico (más confiable)
-    patrones_nombres = [
-        # Patrones con contexto claro (prioridad alta)
-        r'(?:filename|file name|nombre archivo|archivo|file)[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
-        r'(?:saved as|guardado como|save as|guardado|saved)[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
-        r'(?:document|documento|file|archivo)\s+name[:\s=]+["\']?([a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{1,80}\.[a-zA-Z0-9]{2,5})["\']?',
-        # Nombres de archivo al inicio de línea (más probable que sea un nombre real)
-        r'^([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})',
-        # Rutas completas de Windows (solo si tienen estructura válida)
-        r'([A-Z]:\\[a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\\\s]{5,100}\.[a-zA-Z0-9]{2,5})',
-        # Nombres entre comillas o comillas simples
-        r'["\']([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})["\']',
-        # Nombres después de palabras clave comunes
-        r'(?:title|título|name|nombre)[:\s=]+["\']?([a-zA-Z][a-zA-Z0-9_\-áéíóúÁÉÍÓÚñÑ\s]{2,70}\.[a-zA-Z0-9]{2,5})["\']?',
-    ]
-    
-    for patron in patrones_nombres:
-        matches = re.findall(patron, texto_busqueda, re.IGNORECASE | re.MULTILINE)
+    # Frecuencia de cada nombre válido, en orden de aparición
+    contador = Counter()
+    
+    for patron in _PATRONES_NOMBRES:
+        matches = patron.findall(texto_busqueda)
         for match in matches:
             if isinstance(match, tuple):
                 nombre = match[0] if match[0] else match[1] if len(match) > 1 else None
@@ -114,23 +145,20 @@ def extract_filename_from_content(texto, datos_raw=None):
                 nombre = nombre.strip('"\' \t\r\n')
                 if os.path.sep in nombre:
                     nombre = os.path.basename(nombre)
-                # Validar que sea un nombre válido
+                # Validar que sea un nombre válido, antes y después de limpiarlo
                 if is_valid_filename(nombre):
-                    nombres_candidatos.append(nombre)
-    
-    # Filtrar y validar todos los candidatos
-    nombres_validos = []
-    for nombre in nombres_candidatos:
-        nombre_limpio = clean_filename(nombre)
-        if nombre_limpio and is_valid_filename(nombre_limpio):
-            nombres_validos.append(nombre_limpio)
+                    nombre_limpio = clean_filename(nombre)
+                    if nombre_limpio and is_valid_filename(nombre_limpio):
+                        contador[nombre_limpio] += 1
+        
+        # Un nombre que ya aparece repetido con los patrones más fiables se da
+        # por bueno sin pasar los demás sobre el texto
+        if contador and contador.most_common(1)[0][1] >= 2:
+            break
     
     # Retornar el mejor candidato (el más común o el primero válido)
-    if nombres_validos:
-        # Contar frecuencia - el más común es probablemente el correcto
-        contador = Counter(nombres_validos)
-        mejor_nombre = contador.most_common(1)[0][0]
-        return mejor_nombre
+    if contador:
+        return contador.most_common(1)[0][0]
     
     return None
 
@@ -140,26 +168,21 @@ def is_valid_filename(nombre):
     if not nombre or len(nombre) < 3 or len(nombre) > 200:
         return False
     
-    # No debe tener demasiados caracteres especiales consecutivos
-    if re.search(r'[_\-\s]{3,}', nombre):
+    # Debe tener al menos una letra (con ella tampoco puede ser solo números
+    # y caracteres especiales)
+    if not _LETRA.search(nombre):
         return False
     
-    # Debe tener al menos una letra
-    if not re.search(r'[a-zA-Z]', nombre):
+    # No debe tener demasiados caracteres especiales consecutivos ni
+    # secuencias sospechosas (muchos caracteres repetidos)
+    if _SOSPECHOSO.search(nombre):
         return False
     
-    # No debe tener demasiados caracteres no imprimibles
-    caracteres_imprimibles = sum(1 for c in nombre if c.isprintable() or c in ' \t')
-    if caracteres_imprimibles / len(nombre) < 0.8:
-        return False
-    
-    # No debe ser solo números y caracteres especiales
-    if re.match(r'^[\d\s_\-\.]+$', nombre):
-        return False
-    
-    # No debe tener secuencias sospechosas (muchos caracteres repetidos)
-    if re.search(r'(.)\1{4,}', nombre):
-        return False
+    # No debe tener demasiados caracteres no imprimibles (solo se cuentan
+    # si hay alguno)
+    if not nombre.isprintable():
+        caracteres_imprimibles = sum(1 for c in nombre if c.isprintable() or c in ' \t')
+        if caracteres_imprimibles / len(nombre) < 0.8:
+            return False
     
     return True
-
@@ -0,0 +1,181 @@
+"""Estructuras compactas para deduplicación por hash"""
+
+from itertools import islice
+
+try:
+    import numpy as np
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+if NUMBA_AVAILABLE:
+    # Sondeo lineal sobre la tabla; el 0 marca las posiciones libres
+    @njit(types.boolean(types.uint64[:], types.uint64), cache=True, nogil=True)
+    def _table_add(table, h):
+        mask = table.shape[0] - 1
+        i = h & mask
+        while True:
+            slot = table[i]
+            if slot == h:
+                return False
+            if slot == 0:
+                table[i] = h
+                return True
+            i = (i + 1) & mask
+    
+    @njit(types.boolean(types.uint64[:], types.uint64), cache=True, nogil=True)
+    def _table_contains(table, h):
+        mask = table.shape[0] - 1
+        i = h & mask
+        while True:
+            slot = table[i]
+            if slot == h:
+                return True
+            if slot == 0:
+                return False
+            i = (i + 1) & mask
+    
+    @njit(types.int64(types.uint64[:], types.uint64[:], types.int64), cache=True, nogil=True)
+    def _table_rebuild(old_table, table, keep_count):
+        mask = table.shape[0] - 1
+        count = 0
+        for k in range(old_table.shape[0]):
+            h = old_table[k]
+            if h == 0:
+                continue
+            if count >= keep_count:
+                break
+            i = h & mask
+            while table[i] != 0:
+                i = (i + 1) & mask
+            table[i] = h
+            count += 1
+        return count
+    
+    class HashSet64:
+        """
+        Conjunto compacto de hashes de 64 bits
+        
+        Tabla de direccionamiento abierto (sondeo lineal) sobre un array uint64
+        de numpy, recorrida por kernels numba: cada entrada ocupa 8 bytes en
+        lugar de los ~90 de un int dentro de un set. El 0 marca las posiciones
+        libres, así que se guarda aparte.
+        """
+        
+        __slots__ = ('_table', '_count', '_has_zero')
+        
+        def __init__(self, capacity=1 << 16):
+            """
+            Args:
+                capacity: Tamaño inicial de la tabla (se redondea a potencia de 2)
+            """
+            size = 1
+            while size < capacity:
+                size <<= 1
+            self._table = np.zeros(size, dtype=np.uint64)
+            self._count = 0
+            self._has_zero = False
+        
+        def __len__(self):
+            return self._count
+        
+        def __contains__(self, h):
+            h &= _MASK64
+            if not h:
+                return self._has_zero
+            return _table_contains(self._table, h)
+        
+        def add(self, h):
+            """Añade un hash; devuelve True si no estaba ya en el conjunto"""
+            h &= _MASK64
+            if not h:
+                if self._has_zero:
+                    return False
+                self._has_zero = True
+                self._count += 1
+                return True
+            
+            if not _table_add(self._table, h):
+                return False
+            
+            self._count += 1
+            # Mantener la carga por debajo del 50% para sondeos cortos
+            if self._count * 2 > self._table.shape[0]:
+                self._rebuild(self._table.shape[0] * 2, self._count)
+            return True
+        
+        def clear(self):
+            """Vacía el conjunto conservando la capacidad actual"""
+            self._table = np.zeros(self._table.shape[0], dtype=np.uint64)
+            self._count = 0
+            self._has_zero = False
+        
+        def shrink(self, keep_count):
+            """
+            Reduce el conjunto a keep_count hashes
+            
+            Se conservan los primeros de la tabla; como su posición depende del
+            propio hash, equivale a quedarse con una muestra aleatoria.
+            """
+            if keep_count >= self._count:
+                return
+            self._rebuild(self._table.shape[0], keep_count)
+        
+        def _rebuild(self, size, keep_count):
+            """Reinserta hasta keep_count hashes en una tabla nueva de tamaño size"""
+            table = np.zeros(size, dtype=np.uint64)
+            self._has_zero = self._has_zero and keep_count > 0
+            count = 1 if self._has_zero else 0
+            count += _table_rebuild(self._table, table, keep_count - count)
+            
+            self._table = table
+            self._count = count
+else:
+    class HashSet64:
+        """
+        Conjunto de hashes de 64 bits sobre un set
+        
+        Sin numba, un sondeo en Python puro es más lento que el set nativo,
+        así que se usa este con la misma interfaz.
+        """
+        
+        __slots__ = ('_set',)
+        
+        def __init__(self, capacity=1 << 16):
+            """
+            Args:
+                capacity: Se ignora; el set crece por sí solo
+            """
+            self._set = set()
+        
+        def __len__(self):
+            return len(self._set)
+        
+        def __contains__(self, h):
+            return h & _MASK64 in self._set
+        
+        def add(self, h):
+            """Añade un hash; devuelve True si no estaba ya en el conjunto"""
+            hashes = self._set
+            count = len(hashes)
+            hashes.add(h & _MASK64)
+            return len(hashes) != count
+        
+        def clear(self):
+            """Vacía el conjunto"""
+            self._set.clear()
+        
+        def shrink(self, keep_count):
+            """
+            Reduce el conjunto a keep_count hashes
+            
+            El orden de un set depende del hash, así que quedarse con los
+            primeros equivale a una muestra aleatoria.
+            """
+            if keep_count >= len(self._set):
+                return
+            self._set = set(islice(self._set, keep_count))
@@ -0,0 +1,41 @@
+"""Clasificación de bytes imprimibles por bloque (acelerada con numba si está disponible)"""
+
+from utils.encoding_utils import IMPRIMIBLES, printable_counts as _printable_counts_python
+
+try:
+    import numpy as np
+    from numba import njit, types
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+    # Tabla de 256 entradas: True para los bytes imprimibles
+    _PRINTABLE_LUT = np.zeros(256, dtype=np.bool_)
+    _PRINTABLE_LUT[list(IMPRIMIBLES)] = True
+    
+    # Los bloques llegan como bytes, así que np.frombuffer da un array de solo lectura
+    _BYTES_ARRAY = types.Array(types.uint8, 1, 'C', readonly=True)
+    
+    # Firma explícita y cache=True: se compila una vez y se reutiliza entre ejecuciones.
+    # nogil=True permite clasificar en el hilo lector mientras se analiza otro lote
+    @njit(types.int64[:](_BYTES_ARRAY, types.boolean[:], types.int64), cache=True, nogil=True)
+    def _printable_counts_kernel(data, lut, step):
+        n = data.shape[0]
+        tramos = (n + step - 1) // step
+        counts = np.zeros(tramos + 1, dtype=np.int64)
+        total = 0
+        for k in range(tramos):
+            fin = min(n, (k + 1) * step)
+            for i in range(k * step, fin):
+                if lut[data[i]]:
+                    total += 1
+            counts[k + 1] = total
+        return counts
+    
+    def printable_counts(data, step):
+        """Cuenta acumulada de imprimibles por tramos de step bytes (kernel numba)"""
+        return _printable_counts_kernel(np.frombuffer(data, dtype=np.uint8), _PRINTABLE_LUT, step)
+else:
+    printable_counts = _printable_counts_python